@@ -2,28 +2,215 @@ import logging
 import os
 import time
 import shutil
+import threading
 
 from app.utils import (
+    configure_logging,
     ensure_dir,
     format_seconds,
     create_output_dirs,
+    discover_inputs,
     get_audio_metadata,
     is_audio_file,
-    is_transcript_file,
+    is_up_to_date,
     list_directory_contents,
     sanitize_filename,
     safe_file_operation,
     read_file,
     write_file,
-    chunk_text,
-    estimate_tokens,
 )
 from app.audio_utils import convert_to_wav, get_audio_length, plot_waveform
-from app.transcription import transcribe_audio, transcribe_audio_with_openai
-from app.diarization import diarize_audio
+from app.transcription import get_transcription_path, transcribe_chunks
+from app.diarization import diarize_audio, load_waveform
 from app.merge import merge_transcriptions, merge_raw_transcriptions
 from app.split import split_audio_by_diarization
-from app.summarize import summarize_transcript
+from app.summarize import ModelConfig, summarize_transcript
+
+
+# Diarization is GPU/CPU bound, so only one file is diarized at a time while other
+# files run their network-bound transcription and summarization stages.
+_diarization_slots = threading.BoundedSemaphore(1)
+
+def _plot_waveforms_enabled():
+    """
+    Checks whether a waveform plot should be saved for each audio file.
+
+    Plots are on by default; PLOT_WAVEFORMS=false skips them for batch runs that
+    do not need the figures.
+
+    Returns:
+        bool: True if waveform plots are enabled.
+    """
+    return os.getenv("PLOT_WAVEFORMS", "true").lower() not in ("0", "false", "no")
+
+
+@safe_file_operation
+def diarize_and_split(file_path, wav_file, output_dirs, hf_auth_token, progress, file_task):
+    """
+    Diarizes a converted WAV file and splits it into speaker chunks.
+
+    Args:
+        file_path (str): Path to the original audio file.
+        wav_file (str): Path to the converted WAV file.
+        output_dirs (dict): Dictionary of output directories.
+        hf_auth_token (str): HuggingFace authentication token.
+        progress (rich.progress.Progress): Progress bar object.
+        file_task (int): Task ID for the file being processed.
+
+    Returns:
+        tuple: The diarization annotation and the list of chunk file paths.
+    """
+    # Diarization. The audio is loaded before waiting for the slot, so loading
+    # overlaps with the diarization of another file.
+    progress.update(file_task, description="Waiting for diarization", completed=20)
+    audio = load_waveform(wav_file)
+    with _diarization_slots:
+        progress.update(file_task, description="Diarizing audio", completed=30)
+        logging.info(f"Starting diarization for {wav_file}...")
+        step_start_time = time.time()
+        diarization = diarize_audio(
+            wav_file, output_dirs["diarizations"], hf_auth_token, audio=audio
+        )
+        diarization_time = time.time() - step_start_time
+        logging.info(f"Diarization time: {format_seconds(diarization_time)}")
+    del audio
+
+    if diarization is None:
+        raise ValueError(f"Diarization failed for {file_path}")
+
+    # Split Audio by Diarization
+    progress.update(file_task, description="Splitting audio", completed=40)
+    logging.info(f"Splitting audio for {wav_file}...")
+    step_start_time = time.time()
+    chunk_files = split_audio_by_diarization(
+        wav_file, diarization, output_dirs["temp_chunks"]
+    )
+    split_time = time.time() - step_start_time
+    logging.info(f"Split time: {format_seconds(split_time)}")
+
+    if not chunk_files:
+        raise ValueError(f"No audio chunks found in {output_dirs['temp_chunks']}")
+
+    remove_stale_intermediates(chunk_files, output_dirs)
+
+    # Log the contents of the temp_chunks directory
+    if os.getenv("DEBUG_DIRS"):
+        list_directory_contents(output_dirs["temp_chunks"])
+
+    return diarization, chunk_files
+
+
+def remove_stale_intermediates(chunk_files, output_dirs):
+    """
+    Removes chunks and chunk transcriptions left by an earlier run of the same file.
+
+    The merge lists the temporary directories by suffix, so files from a split with
+    different boundaries would otherwise be merged into the new transcript.
+    Transcriptions of chunks that were written again under the same name are kept
+    for reuse, since the same name covers the same samples.
+
+    Args:
+        chunk_files (list): Paths to the audio chunks of the current split.
+        output_dirs (dict): Dictionary of output directories.
+    """
+    current = {os.path.basename(chunk_file) for chunk_file in chunk_files}
+    current.update(
+        os.path.basename(
+            get_transcription_path(chunk_file, output_dirs["temp_transcriptions"])
+        )
+        for chunk_file in chunk_files
+    )
+    removed = 0
+    for directory in (output_dirs["temp_chunks"], output_dirs["temp_transcriptions"]):
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name not in current:
+                    os.remove(entry.path)
+                    removed += 1
+    if removed:
+        logging.info(f"Removed {removed} intermediate files left by an earlier run")
+
+
+@safe_file_operation
+def transcribe_and_merge(
+    wav_file,
+    diarization,
+    chunk_files,
+    output_dirs,
+    openai_api_key,
+    use_openai,
+    progress,
+    file_task,
+    max_concurrent_transcriptions=5,
+    keep_intermediates=False,
+):
+    """
+    Transcribes the speaker chunks of a file and merges them into a single transcript.
+
+    Args:
+        wav_file (str): Path to the converted WAV file.
+        diarization (pyannote.core.Annotation): Diarization annotation.
+        chunk_files (list): Paths to the audio chunks.
+        output_dirs (dict): Dictionary of output directories.
+        openai_api_key (str): OpenAI API key.
+        use_openai (bool): Whether to use OpenAI for transcription.
+        progress (rich.progress.Progress): Progress bar object.
+        file_task (int): Task ID for the file being processed.
+        max_concurrent_transcriptions (int): Maximum number of chunks transcribed
+            concurrently with OpenAI. Local Whisper decodes chunks in batches instead.
+        keep_intermediates (bool): Whether to reuse chunk transcriptions left by an
+            earlier run.
+
+    Returns:
+        str: The merged transcribed text with speaker labels and timestamps.
+    """
+    # Transcription
+    progress.update(file_task, description="Transcribing audio", completed=60)
+    logging.info(f"Starting transcription for {len(chunk_files)} chunks...")
+    step_start_time = time.time()
+    transcriptions = transcribe_chunks(
+        chunk_files,
+        output_dirs["temp_transcriptions"],
+        openai_api_key,
+        use_openai,
+        max_concurrent=max_concurrent_transcriptions,
+        reuse_existing=keep_intermediates,
+    )
+    transcription_time = time.time() - step_start_time
+    logging.info(f"Transcription time: {format_seconds(transcription_time)}")
+
+    # Log the contents of the temp_transcriptions directory
+    if os.getenv("DEBUG_DIRS"):
+        list_directory_contents(output_dirs["temp_transcriptions"])
+
+    # Verify that transcriptions match chunk files
+    if len(transcriptions) != len(chunk_files):
+        logging.warning(
+            f"Mismatch between the number of transcriptions ({len(transcriptions)}) and chunk files ({len(chunk_files)})."
+        )
+
+    # Merge Transcriptions
+    progress.update(file_task, description="Merging transcriptions", completed=80)
+    logging.info("Merging transcriptions...")
+    step_start_time = time.time()
+    raw_merged_transcript = merge_raw_transcriptions(
+        output_dirs["temp_transcriptions"],
+        wav_file,
+        output_dirs["transcriptions"],
+    )
+    merged_output = merge_transcriptions(
+        raw_merged_transcript,
+        diarization,
+        wav_file,
+        output_dirs["merged_output"],
+        output_dirs["temp_chunks"],
+    )
+    merge_time = time.time() - step_start_time
+    logging.info(f"Merge time: {format_seconds(merge_time)}")
+
+    return merged_output
 
 
 @safe_file_operation
@@ -35,6 +222,9 @@ def process_audio_file(
     use_openai,
     progress,
     file_task,
+    max_concurrent_transcriptions=5,
+    keep_intermediates=False,
+    stem=None,
 ):
     """
     Process a single audio file.
@@ -47,14 +237,18 @@ def process_audio_file(
         use_openai (bool): Whether to use OpenAI for transcription.
         progress (rich.progress.Progress): Progress bar object.
         file_task (int): Task ID for the file being processed.
+        max_concurrent_transcriptions (int): Maximum number of chunks transcribed
+            concurrently with OpenAI. Local Whisper decodes chunks in batches instead.
+        keep_intermediates (bool): Whether to keep the temporary WAV, chunks and
+            transcriptions so a rerun can skip conversion and finished chunks.
+        stem (str, optional): Sanitized file stem, if the caller already computed it.
 
     Returns:
         str: Path to the merged output file.
     """
     logging.info(f"Processing audio file: {file_path}")
-    step_start_time = time.time()
 
-    sanitized_basename = sanitize_filename(
+    sanitized_basename = stem or sanitize_filename(
         os.path.splitext(os.path.basename(file_path))[0]
     )
     wav_file = os.path.join(
@@ -66,104 +260,53 @@ def process_audio_file(
         # Convert to WAV
         progress.update(file_task, description="Converting to WAV", completed=10)
         logging.info(f"Converting {file_path} to WAV...")
-        convert_to_wav(file_path, wav_file)
+        step_start_time = time.time()
+        if keep_intermediates and os.path.exists(wav_file):
+            logging.info(f"Reusing existing WAV file {wav_file}")
+            samples = None
+        else:
+            samples = convert_to_wav(file_path, wav_file)
         convert_time = time.time() - step_start_time
         logging.info(f"Conversion time: {format_seconds(convert_time)}")
 
-        # Diarization
-        progress.update(file_task, description="Diarizing audio", completed=30)
-        logging.info(f"Starting diarization for {wav_file}...")
-        step_start_time = time.time()
-        diarization = diarize_audio(
-            wav_file, output_dirs["diarizations"], hf_auth_token
-        )
-        diarization_time = time.time() - step_start_time
-        logging.info(f"Diarization time: {format_seconds(diarization_time)}")
-
-        if diarization is None:
-            raise ValueError(f"Diarization failed for {file_path}")
-
-        # Split Audio by Diarization
-        progress.update(file_task, description="Splitting audio", completed=40)
-        logging.info(f"Splitting audio for {wav_file}...")
-        step_start_time = time.time()
-        chunk_files = split_audio_by_diarization(
-            wav_file, diarization, output_dirs["temp_chunks"]
-        )
-        split_time = time.time() - step_start_time
-        logging.info(f"Split time: {format_seconds(split_time)}")
-
-        if not chunk_files:
-            raise ValueError(f"No audio chunks found in {output_dirs['temp_chunks']}")
-
-        # Log the contents of the temp_chunks directory
-        list_directory_contents(output_dirs["temp_chunks"])
-
-        # Transcription
-        progress.update(file_task, description="Transcribing audio", completed=60)
-        logging.info(f"Starting transcription for {len(chunk_files)} chunks...")
-        step_start_time = time.time()
-        transcriptions = []
-        for chunk_file in chunk_files:
-            if use_openai:
-                transcription = transcribe_audio_with_openai(
-                    chunk_file,
-                    output_dirs["temp_transcriptions"],
-                    openai_api_key,
-                )
+        # Generate and save a waveform plot from the samples already in memory
+        progress.update(file_task, description="Generating waveform plot", completed=15)
+        try:
+            figure_filename = (
+                os.path.splitext(os.path.basename(wav_file))[0] + "_waveform.png"
+            )
+            figure_path = os.path.join(output_dirs["figures"], figure_filename)
+            if not _plot_waveforms_enabled():
+                logging.info("Waveform plots are disabled, skipping")
+            elif is_up_to_date(figure_path, file_path):
+                logging.info(f"Waveform plot {figure_path} is up to date, skipping")
             else:
-                transcription = transcribe_audio(
-                    chunk_file,
-                    output_dirs["temp_transcriptions"],
-                    openai_api_key,
+                logging.info("Generating waveform plot...")
+                step_start_time = time.time()
+                plot_waveform(
+                    wav_file, output_dirs["figures"], figure_filename, signal=samples
                 )
+                figure_time = time.time() - step_start_time
+                logging.info(f"Figure generation time: {format_seconds(figure_time)}")
+        except Exception as e:
+            logging.error(f"Error generating waveform plot: {str(e)}")
+        del samples
 
-            if transcription:
-                transcriptions.append(transcription)
-        transcription_time = time.time() - step_start_time
-        logging.info(f"Transcription time: {format_seconds(transcription_time)}")
-
-        # Log the contents of the temp_transcriptions directory
-        list_directory_contents(output_dirs["temp_transcriptions"])
-
-        # Verify that transcriptions match chunk files
-        if len(transcriptions) != len(chunk_files):
-            logging.warning(
-                f"Mismatch between the number of transcriptions ({len(transcriptions)}) and chunk files ({len(chunk_files)})."
-            )
-
-        # Merge Transcriptions
-        progress.update(file_task, description="Merging transcriptions", completed=80)
-        logging.info("Merging transcriptions...")
-        step_start_time = time.time()
-        raw_merged_transcript = merge_raw_transcriptions(
-            output_dirs["temp_transcriptions"],
-            wav_file,
-            output_dirs["transcriptions"],
+        diarization, chunk_files = diarize_and_split(
+            file_path, wav_file, output_dirs, hf_auth_token, progress, file_task
         )
-        merged_output = merge_transcriptions(
-            raw_merged_transcript,
-            diarization,
+        merged_output = transcribe_and_merge(
             wav_file,
-            output_dirs["merged_output"],
-            output_dirs["temp_chunks"],
+            diarization,
+            chunk_files,
+            output_dirs,
+            openai_api_key,
+            use_openai,
+            progress,
+            file_task,
+            max_concurrent_transcriptions,
+            keep_intermediates,
         )
-        merge_time = time.time() - step_start_time
-        logging.info(f"Merge time: {format_seconds(merge_time)}")
-
-        # Generate and save a waveform plot
-        progress.update(file_task, description="Generating waveform plot", completed=90)
-        try:
-            logging.info("Generating waveform plot...")
-            step_start_time = time.time()
-            figure_filename = (
-                os.path.basename(wav_file).rsplit(".", 1)[0] + "_waveform.png"
-            )
-            plot_waveform(wav_file, output_dirs["figures"], figure_filename)
-            figure_time = time.time() - step_start_time
-            logging.info(f"Figure generation time: {format_seconds(figure_time)}")
-        except Exception as e:
-            logging.error(f"Error generating waveform plot: {str(e)}")
 
         logging.info(f"Finished processing {file_path}")
         progress.update(file_task, completed=100)
@@ -175,14 +318,15 @@ def process_audio_file(
 
     finally:
         # Clean up temporary directories
-        for temp_dir in [
-            output_dirs["temp_wav"],
-            output_dirs["temp_chunks"],
-            output_dirs["temp_transcriptions"],
-        ]:
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-                logging.info(f"Cleaned up temporary directory: {temp_dir}")
+        if not keep_intermediates:
+            for temp_dir in [
+                output_dirs["temp_wav"],
+                output_dirs["temp_chunks"],
+                output_dirs["temp_transcriptions"],
+            ]:
+                if os.path.exists(temp_dir):
+                    shutil.rmtree(temp_dir)
+                    logging.info(f"Cleaned up temporary directory: {temp_dir}")
 
 
 @safe_file_operation
@@ -208,7 +352,9 @@ def process_transcript_file(file_path, output_dirs, progress, file_task):
         output_file = os.path.join(
             output_dirs["merged_output"], os.path.basename(file_path)
         )
-        write_file(output_file, transcript)
+        # copyfile uses the kernel's zero-copy path where available instead of
+        # re-encoding the text we just read.
+        shutil.copyfile(file_path, output_file)
 
         process_time = time.time() - step_start_time
         logging.info(f"Transcript processing time: {format_seconds(process_time)}")
@@ -221,6 +367,80 @@ def process_transcript_file(file_path, output_dirs, progress, file_task):
         raise
 
 
+@safe_file_operation
+def summarize_and_finalize(
+    file_path,
+    merged_output,
+    output_dirs,
+    stem,
+    processed_dir,
+    summary_prompt_file,
+    model_config,
+    progress,
+    file_task,
+    file_start_time,
+):
+    """
+    Summarizes a merged transcript, saves the summary and moves the input file
+    to the processed directory.
+
+    Args:
+        file_path (str): Path to the input file.
+        merged_output (str): The merged transcript, or None if there is nothing to summarize.
+        output_dirs (dict): Dictionary of output directories.
+        stem (str): Sanitized file stem used to name the summary.
+        processed_dir (str): Directory to move processed files.
+        summary_prompt_file (str): Path to the summary prompt file.
+        model_config (ModelConfig): Model, token limit and API key to summarize with.
+        progress (rich.progress.Progress): Progress bar object.
+        file_task (int): Task ID for the file being processed.
+        file_start_time (float): Time at which processing of the file started.
+
+    Returns:
+        float: The time spent summarizing and moving the file in seconds.
+    """
+    finalize_start_time = time.time()
+    if merged_output is not None:
+        # Summarization
+        progress.update(file_task, description="Summarizing", advance=10)
+        logging.info(f"Starting summarization for {file_path}...")
+        step_start_time = time.time()
+
+        # summarize_transcript chunks transcripts over the token limit and
+        # summarizes the chunks concurrently before combining them.
+        summary = summarize_transcript(
+            merged_output,
+            summary_prompt_file,
+            model_config.api_key,
+            model_config.name,
+            model_config.token_limit,
+        )
+        progress.update(file_task, advance=10)
+
+        summary_file = os.path.join(
+            output_dirs["summary"],
+            stem + "_summary.md",
+        )
+        write_file(summary_file, summary)
+        summarize_time = time.time() - step_start_time
+        logging.info(f"Summarization time: {format_seconds(summarize_time)}")
+        logging.info(f"Summarization completed and saved to {summary_file}")
+
+    # Move the processed file
+    processed_file_path = os.path.join(
+        processed_dir, os.path.basename(file_path)
+    )
+    shutil.move(file_path, processed_file_path)
+    logging.info(f"Moved processed file to {processed_file_path}")
+
+    file_time = time.time() - file_start_time
+    logging.info(
+        f"Total time taken for file {file_path}: {format_seconds(file_time)}"
+    )
+    return time.time() - finalize_start_time
+
+
+
 def process_files(
     input_dir,
     processed_dir,
@@ -241,6 +461,9 @@ def process_files(
     recording_name,
     progress,
     file_task,
+    max_concurrent_transcriptions=5,
+    keep_intermediates=False,
+    summary_executor=None,
 ):
     """
     Processes audio files and transcript files.
@@ -265,9 +488,19 @@ def process_files(
         recording_name (str): Custom recording name.
         progress (rich.progress.Progress): Progress bar object.
         file_task (int): Task ID for the file being processed.
+        max_concurrent_transcriptions (int): Maximum number of concurrent OpenAI
+            transcription requests per audio file.
+        keep_intermediates (bool): Whether to keep temporary files in a stable
+            per-recording directory so an interrupted run can be resumed.
+        summary_executor (concurrent.futures.Executor, optional): Executor to run
+            summarization on. When given, each file is handed to it once merged and
+            this function returns without waiting; otherwise files are summarized
+            in turn.
 
     Returns:
-        float: The total processing time for all files in seconds.
+        tuple: The processing time for all files in seconds, up to summarization
+        when summary_executor is given, and the futures of the submitted
+        summaries, each resolving to the time spent summarizing.
     """
     ensure_dir(input_dir)
     ensure_dir(processed_dir)
@@ -279,6 +512,20 @@ def process_files(
 
     logging.info("Starting to process input files...")
 
+    providers = {
+        anthropic_model: ModelConfig(
+            anthropic_model, anthropic_token_limit, anthropic_api_key
+        ),
+        openai_model: ModelConfig(openai_model, openai_token_limit, openai_api_key),
+    }
+    model_config = providers.get(summarization_model)
+    if model_config is None:
+        raise ValueError(
+            f"Unsupported summarization model {summarization_model!r}; "
+            f"expected {openai_model!r} or {anthropic_model!r}"
+        )
+
+    summary_futures = []
     for file_name in audio_files + transcript_files:
         file_path = os.path.join(input_dir, file_name)
         if recording_date is None:
@@ -291,16 +538,19 @@ def process_files(
         else:
             default_date = recording_date
 
+        stem = sanitize_filename(os.path.splitext(file_name)[0])
         if recording_name is None:
-            default_name = sanitize_filename(
-                os.path.splitext(os.path.basename(file_path))[0]
-            )
+            sanitized_recording_name = stem
         else:
-            default_name = sanitize_filename(recording_name)
+            sanitized_recording_name = sanitize_filename(recording_name)
 
-        sanitized_recording_name = sanitize_filename(default_name)
         output_dirs = create_output_dirs(
-            base_output_dir, default_date, sanitized_recording_name
+            base_output_dir,
+            default_date,
+            sanitized_recording_name,
+            temp_id=f"{default_date}-{sanitized_recording_name}"
+            if keep_intermediates
+            else None,
         )
 
         file_start_time = time.time()
@@ -314,96 +564,39 @@ def process_files(
                     use_openai,
                     progress,
                     file_task,
+                    max_concurrent_transcriptions,
+                    keep_intermediates,
+                    stem=stem,
                 )
             else:
                 merged_output = process_transcript_file(
                     file_path, output_dirs, progress, file_task
                 )
 
-            if merged_output is not None:
-                # Summarization
-                progress.update(file_task, description="Summarizing", advance=10)
-                logging.info(f"Starting summarization for {file_path}...")
-                step_start_time = time.time()
-
-                current_model = summarization_model
-                current_token_limit = (
-                    openai_token_limit
-                    if summarization_model == openai_model
-                    else anthropic_token_limit
-                )
-                current_api_key = (
-                    openai_api_key
-                    if summarization_model == openai_model
-                    else anthropic_api_key
-                )
-
-                # Chunk the merged output if it exceeds the token limit
-                estimated_tokens = estimate_tokens(merged_output)
-                if estimated_tokens > current_token_limit:
-                    logging.info(
-                        "Merged output exceeds token limit. Chunking the text."
-                    )
-
-                    chunks = chunk_text(merged_output, current_token_limit)
-                    summaries = []
-                    for i, chunk in enumerate(chunks):
-                        logging.info(f"Summarizing chunk {i+1}/{len(chunks)}...")
-                        chunk_summary = summarize_transcript(
-                            chunk,
-                            summary_prompt_file,
-                            current_api_key,
-                            current_model,
-                            current_token_limit,
-                        )
-                        summaries.append(chunk_summary)
-                        progress.update(file_task, advance=5 / len(chunks))
-
-                    # Combine chunk summaries
-                    combined_summary = "\n\n".join(summaries)
-                    summary = summarize_transcript(
-                        combined_summary,
-                        summary_prompt_file,
-                        current_api_key,
-                        current_model,
-                        current_token_limit,
-                        is_final_summary=True,
-                    )
-                else:
-                    summary = summarize_transcript(
-                        merged_output,
-                        summary_prompt_file,
-                        current_api_key,
-                        current_model,
-                        current_token_limit,
-                    )
-                    progress.update(file_task, advance=10)
-
-                summary_file = os.path.join(
-                    output_dirs["summary"],
-                    sanitize_filename(os.path.basename(file_path).rsplit(".", 1)[0])
-                    + "_summary.md",
-                )
-                write_file(summary_file, summary)
-                summarize_time = time.time() - step_start_time
-                logging.info(f"Summarization time: {format_seconds(summarize_time)}")
-                logging.info(f"Summarization completed and saved to {summary_file}")
-
             total_size += os.path.getsize(file_path)
             if is_audio_file(file_path):
                 total_length += get_audio_length(file_path)
 
-            # Move the processed file
-            processed_file_path = os.path.join(
-                processed_dir, os.path.basename(file_path)
-            )
-            shutil.move(file_path, processed_file_path)
-            logging.info(f"Moved processed file to {processed_file_path}")
-
-            file_time = time.time() - file_start_time
-            logging.info(
-                f"Total time taken for file {file_path}: {format_seconds(file_time)}"
+            summary_args = (
+                file_path,
+                merged_output,
+                output_dirs,
+                stem,
+                processed_dir,
+                summary_prompt_file,
+                model_config,
+                progress,
+                file_task,
+                file_start_time,
             )
+            if summary_executor is None:
+                summarize_and_finalize(*summary_args)
+            else:
+                # Summarization runs on the caller's worker so the next file's
+                # transcription is not held up by the API call.
+                summary_futures.append(
+                    summary_executor.submit(summarize_and_finalize, *summary_args)
+                )
 
         except Exception as e:
             logging.error(f"Error processing file {file_path}: {str(e)}")
@@ -421,10 +614,11 @@ def process_files(
         f"Number of files processed: {len(audio_files) + len(transcript_files)}"
     )
 
-    return total_time  # Return the total processing time
+    return total_time, summary_futures
 
 
 if __name__ == "__main__":
+    configure_logging()
     # This section is kept for backwards compatibility and testing
     import os
     from dotenv import load_dotenv
@@ -445,14 +639,7 @@ if __name__ == "__main__":
     openai_token_limit = int(os.getenv("OPENAI_MODEL_TOKEN_LIMIT", 8000))
     anthropic_token_limit = int(os.getenv("ANTHROPIC_MODEL_TOKEN_LIMIT", 100000))
 
-    audio_files = [
-        f for f in os.listdir(input_dir) if is_audio_file(os.path.join(input_dir, f))
-    ]
-    transcript_files = [
-        f
-        for f in os.listdir(input_dir)
-        if is_transcript_file(os.path.join(input_dir, f))
-    ]
+    audio_files, transcript_files = discover_inputs(input_dir)
 
     with Progress() as progress:
         file_task = progress.add_task("Processing files", total=100)
@@ -1,52 +1,166 @@
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
 import subprocess
+import struct
 import wave
 import numpy as np
 import os
 import logging
+import shutil
+import threading
+from functools import lru_cache
 from mutagen.mp4 import MP4
-from app.utils import ensure_dir, safe_file_operation
+from app.utils import configure_logging, ensure_dir, safe_file_operation
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+SAMPLE_RATE = 16000
+
+# One figure is reused for every waveform plot instead of being set up per file.
+# Files are processed concurrently, so drawing on it is serialized.
+_waveform_figure = None
+_waveform_axes = None
+_waveform_lock = threading.Lock()
+
+def _get_waveform_axes():
+    """
+    Returns the shared waveform figure and axes, cleared for a new plot.
+
+    matplotlib is imported here on first use, so runs and modules that never plot
+    a waveform do not pay for loading it.
+
+    Returns:
+        tuple: (matplotlib.figure.Figure, matplotlib.axes.Axes)
+    """
+    global _waveform_figure, _waveform_axes
+    if _waveform_figure is None:
+        import matplotlib
+        matplotlib.use('Agg')  # Use non-interactive backend
+        # Waveforms are dense; let Agg simplify and chunk long paths when rendering
+        matplotlib.rcParams["path.simplify"] = True
+        matplotlib.rcParams["path.simplify_threshold"] = 1.0
+        matplotlib.rcParams["agg.path.chunksize"] = 10000
+        from matplotlib.figure import Figure
+
+        _waveform_figure = Figure(figsize=(10, 4))
+        _waveform_axes = _waveform_figure.add_subplot()
+    else:
+        _waveform_axes.clear()
+    return _waveform_figure, _waveform_axes
 
 @safe_file_operation
-def convert_to_wav(input_path, output_path):
+def convert_to_pcm_array(input_path):
     """
-    Converts an audio file to WAV format using ffmpeg.
+    Decodes an audio file to 16 kHz mono 16-bit PCM samples using ffmpeg.
+
+    The decoded audio is streamed from ffmpeg's stdout straight into memory, so no
+    intermediate file is written or read back.
 
     Args:
         input_path (str): Path to the input audio file.
-        output_path (str): Path to save the converted WAV file.
+
+    Returns:
+        numpy.ndarray: The decoded int16 samples.
 
     Raises:
-        subprocess.CalledProcessError: If the conversion fails.
+        subprocess.CalledProcessError: If the decoding fails.
     """
     try:
+        # Each file gets its own single-threaded ffmpeg; files are converted in
+        # parallel by the file workers, so extra decoder threads would oversubscribe.
         cmd = [
             "ffmpeg",
+            "-nostdin",
+            "-hide_banner",
+            "-loglevel", "error",
+            "-threads", "1",
             "-i", input_path,
+            "-f", "s16le",
             "-acodec", "pcm_s16le",
             "-ac", "1",
-            "-ar", "16000",
-            output_path
+            "-ar", str(SAMPLE_RATE),
+            "pipe:1"
         ]
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        logging.info(f"Converted {input_path} to {output_path}")
+        result = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return np.frombuffer(result.stdout, dtype=np.int16)
     except subprocess.CalledProcessError as e:
-        logging.error(f"Error converting file {input_path} to WAV: {e.stderr.decode().strip()}")
+        logging.error(f"Error decoding file {input_path}: {e.stderr.decode().strip()}")
         raise
 
+def _is_target_wav(input_path):
+    """
+    Checks whether a file already is a 16 kHz mono 16-bit PCM WAV file.
+
+    Args:
+        input_path (str): Path to the input audio file.
+
+    Returns:
+        bool: True if the file can be used without conversion.
+    """
+    if not input_path.lower().endswith('.wav'):
+        return False
+    try:
+        # wave only opens uncompressed PCM files
+        with wave.open(input_path, 'rb') as audio_file:
+            return (
+                audio_file.getnchannels() == 1
+                and audio_file.getsampwidth() == 2
+                and audio_file.getframerate() == SAMPLE_RATE
+            )
+    except (wave.Error, EOFError, OSError):
+        return False
+
 @safe_file_operation
-def get_audio_length(file_path):
+def convert_to_wav(input_path, output_path):
     """
-    Gets the length of an audio file in seconds.
+    Converts an audio file to a 16 kHz mono WAV file.
+
+    Inputs that already are 16 kHz mono 16-bit PCM WAV files are linked (or copied
+    across filesystems) to output_path instead of being decoded and re-encoded.
+    Written files are renamed into place once complete, so an interrupted run never
+    leaves a truncated WAV that a resumed run would take as converted.
+
+    Args:
+        input_path (str): Path to the input audio file.
+        output_path (str): Path to save the converted WAV file.
+
+    Returns:
+        numpy.ndarray: The decoded int16 samples, so callers can reuse them without
+        reading the WAV file back.
+
+    Raises:
+        subprocess.CalledProcessError: If the conversion fails.
+    """
+    if _is_target_wav(input_path):
+        if os.path.abspath(input_path) != os.path.abspath(output_path):
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            try:
+                os.link(input_path, output_path)
+            except OSError:
+                temp_path = output_path + ".part"
+                shutil.copyfile(input_path, temp_path)
+                os.replace(temp_path, output_path)
+        logging.info(f"{input_path} is already 16 kHz mono PCM, linked to {output_path}")
+        return read_wav_samples(output_path)[0]
+
+    samples = convert_to_pcm_array(input_path)
+    temp_path = output_path + ".part"
+    with wave.open(temp_path, 'wb') as audio_file:
+        audio_file.setnchannels(1)
+        audio_file.setsampwidth(2)
+        audio_file.setframerate(SAMPLE_RATE)
+        audio_file.writeframes(samples)
+    os.replace(temp_path, output_path)
+    logging.info(f"Converted {input_path} to {output_path}")
+    return samples
+
+@lru_cache(maxsize=128)
+def _read_audio_length(file_path, mtime):
+    """
+    Reads the length of an audio file in seconds from its header.
+
+    The modification time is part of the cache key so a changed file is read again.
 
     Args:
         file_path (str): Path to the audio file.
+        mtime (float): Modification time of the file.
 
     Returns:
         float: The duration of the audio file in seconds.
@@ -56,11 +170,10 @@ def get_audio_length(file_path):
             audio = MP4(file_path)
             return audio.info.length
         elif file_path.lower().endswith('.wav'):
-            with wave.open(file_path, 'rb') as audio_file:
-                frames = audio_file.getnframes()
-                rate = audio_file.getframerate()
-                duration = frames / float(rate)
-                return duration
+            # Only the RIFF header is read; the duration follows from the size of
+            # the data chunk and the byte rate in the fmt chunk.
+            byte_rate, _, data_size = _read_wav_header(file_path)
+            return data_size / float(byte_rate)
         else:
             logging.error(f"Unsupported audio format for {file_path}")
             return 0
@@ -69,7 +182,99 @@ def get_audio_length(file_path):
         return 0
 
 @safe_file_operation
-def plot_waveform(wav_file, output_path, filename):
+def get_audio_length(file_path):
+    """
+    Gets the length of an audio file in seconds.
+
+    Results are cached per path and modification time, so measuring the same input
+    for the job overview and again after processing parses the file only once.
+
+    Args:
+        file_path (str): Path to the audio file.
+
+    Returns:
+        float: The duration of the audio file in seconds.
+    """
+    try:
+        mtime = os.path.getmtime(file_path)
+    except OSError as e:
+        logging.error(f"Error getting audio length for {file_path}: {str(e)}")
+        return 0
+    return _read_audio_length(file_path, mtime)
+
+def _read_wav_header(wav_file):
+    """
+    Walks the RIFF chunks of a WAV file up to the start of its PCM data.
+
+    Args:
+        wav_file (str): Path to the WAV file.
+
+    Returns:
+        tuple: (byte_rate, data_offset, data_size), where byte_rate comes from the
+        fmt chunk and data_offset is the byte offset of the data chunk payload.
+    """
+    byte_rate = None
+    with open(wav_file, 'rb') as f:
+        f.seek(12)  # Skip the RIFF header
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk found in {wav_file}")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                byte_rate = struct.unpack('<8xI', f.read(12))[0]
+                f.seek(chunk_size - 12 + (chunk_size & 1), os.SEEK_CUR)
+            elif chunk_id == b'data':
+                return byte_rate, f.tell(), chunk_size
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+def _wav_data_offset(wav_file):
+    """
+    Finds the byte offset of the PCM data in a WAV file.
+
+    Args:
+        wav_file (str): Path to the WAV file.
+
+    Returns:
+        int: Byte offset at which the data chunk payload starts.
+    """
+    return _read_wav_header(wav_file)[1]
+
+def read_wav_samples(wav_file):
+    """
+    Reads the samples of a 16-bit WAV file without copying them into memory.
+
+    The PCM data is memory-mapped, so pages are only read from disk when they are
+    accessed. Other sample widths are read with the wave module.
+
+    Args:
+        wav_file (str): Path to the WAV file.
+
+    Returns:
+        tuple: The int16 samples as a NumPy array and the sample rate.
+    """
+    with wave.open(wav_file, 'rb') as audio_file:
+        rate = audio_file.getframerate()
+        n_samples = audio_file.getnframes() * audio_file.getnchannels()
+        if audio_file.getsampwidth() != 2:
+            return np.frombuffer(audio_file.readframes(-1), dtype=np.int16), rate
+
+    if n_samples == 0:
+        return np.zeros(0, dtype=np.int16), rate
+    signal = np.memmap(
+        wav_file,
+        dtype=np.int16,
+        mode='r',
+        offset=_wav_data_offset(wav_file),
+        shape=(n_samples,),
+    )
+    return signal, rate
+
+@safe_file_operation
+def plot_waveform(
+    wav_file, output_path, filename, signal=None, rate=SAMPLE_RATE, max_points=4000
+):
     """
     Plots the waveform of a WAV file and saves it as an image.
 
@@ -77,24 +282,46 @@ def plot_waveform(wav_file, output_path, filename):
         wav_file (str): Path to the WAV file.
         output_path (str): The directory to save the waveform image.
         filename (str): The filename for the saved waveform image.
+        signal (numpy.ndarray, optional): Already decoded int16 samples. When given,
+            the WAV file is not read again.
+        rate (int): Sample rate of signal. Ignored when signal is read from wav_file.
+        max_points (int): Maximum number of points to plot. Longer signals are reduced
+            to a min/max envelope. Defaults to 4000.
     """
     try:
-        with wave.open(wav_file, 'rb') as audio_file:
-            signal = audio_file.readframes(-1)
-            signal = np.frombuffer(signal, dtype=np.int16)
-            rate = audio_file.getframerate()
-            time = np.linspace(0.0, len(signal) / rate, num=len(signal))
-
-        plt.figure(figsize=(10, 4))
-        plt.plot(time, signal)
-        plt.title(f"Waveform of {os.path.basename(wav_file)}")
-        plt.xlabel("Time [s]")
-        plt.ylabel("Amplitude")
+        if signal is None:
+            signal, rate = read_wav_samples(wav_file)
+        n_samples = len(signal)
+
+        if n_samples > 2 * max_points:
+            # Reduce to a min/max envelope per bin; at this resolution the plot
+            # looks the same as drawing every sample. The bins differ in length
+            # by at most one sample so none are left over, and each is plotted
+            # at its centre.
+            edges = np.linspace(0, n_samples, num=max_points + 1).astype(np.int64)
+            starts = edges[:-1]
+            time = ((starts + edges[1:]) / (2 * rate)).astype(np.float32)
+            envelope = (
+                np.minimum.reduceat(signal, starts),
+                np.maximum.reduceat(signal, starts),
+            )
+        else:
+            time = np.linspace(0.0, n_samples / rate, num=n_samples, dtype=np.float32)
+            envelope = None
 
         ensure_dir(output_path)
         file_path = os.path.join(output_path, filename)
-        plt.savefig(file_path)
-        plt.close()
+        with _waveform_lock:
+            fig, ax = _get_waveform_axes()
+            if envelope is not None:
+                ax.fill_between(time, *envelope, linewidth=0)
+            else:
+                ax.plot(time, signal)
+            ax.set_title(f"Waveform of {os.path.basename(wav_file)}")
+            ax.set_xlabel("Time [s]")
+            ax.set_ylabel("Amplitude")
+            # The image is informational only, so screen resolution is enough.
+            fig.savefig(file_path, dpi=80)
 
         logging.info(f"Waveform plot saved to {file_path}")
     except Exception as e:
@@ -102,6 +329,7 @@ def plot_waveform(wav_file, output_path, filename):
         raise
 
 if __name__ == "__main__":
+    configure_logging()
     # Example usage and testing
     test_audio_path = "./test/data/test_audio.m4a"
     test_wav_path = "./test/data/test_audio.wav"
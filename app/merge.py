@@ -1,11 +1,60 @@
 import os
+import shutil
 import logging
-from glob import glob
-from app.utils import safe_file_operation, ensure_dir
+from app.utils import configure_logging, safe_file_operation, ensure_dir
+from app.diarization import get_speaker_segments
+from app.split import parse_chunk_filename
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Merged outputs can run to many megabytes; write them in 1 MiB blocks.
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Chunk transcriptions are named after their chunk with this suffix.
+TRANSCRIPTION_SUFFIX = "_transcription.txt"
+
+def _chunk_sort_key(path):
+    """
+    Returns the start time and index encoded in a chunk filename, for sorting.
+
+    Chunks of overlapping speech can start at the same time, so ties are broken
+    by the chunk index to keep the order deterministic.
+
+    Args:
+        path (str): Path to a chunk or chunk transcription file.
+
+    Returns:
+        tuple: (start_time, index), or (0, 0) if the name has none.
+    """
+    name = os.path.basename(path)
+    if name.endswith(TRANSCRIPTION_SUFFIX):
+        name = name[:-len(TRANSCRIPTION_SUFFIX)] + ".wav"
+    segment = parse_chunk_filename(name)
+    if not segment:
+        return 0, 0
+    try:
+        index = int(os.path.splitext(name)[0].rsplit("_", 1)[1])
+    except ValueError:
+        index = 0
+    return segment[0], index
+
+def _list_chunk_files(directory, suffix):
+    """
+    Lists the files in a directory with a given suffix, ordered by chunk start
+    time and index.
+
+    Args:
+        directory (str): Directory to scan.
+        suffix (str): File name suffix to match, e.g. ".wav".
+
+    Returns:
+        list: Paths to the matching files.
+    """
+    with os.scandir(directory) as entries:
+        paths = [
+            entry.path
+            for entry in entries
+            if entry.name.endswith(suffix) and entry.is_file()
+        ]
+    return sorted(paths, key=_chunk_sort_key)
 
 @safe_file_operation
 def merge_transcriptions(
@@ -14,6 +63,10 @@ def merge_transcriptions(
     """
     Merges transcriptions from speaker-specific chunks based on diarization.
 
+    Segments are taken from the chunk filenames, since chunks may span several
+    coalesced diarization turns. If the chunks do not carry their segment in the
+    filename, the diarization turns are used instead.
+
     Args:
         transcriptions_path (str): Path to the merged raw transcripts.
         diarization (Annotation): Diarization annotation.
@@ -26,48 +79,54 @@ def merge_transcriptions(
     """
     try:
         merged_output = []
-        chunk_files = sorted(
-            glob(os.path.join(temp_chunks_dir, "*.wav")),
-            key=lambda x: int(x.split("_chunk_")[1].split("_")[0])
-        )
+        chunk_files = _list_chunk_files(temp_chunks_dir, ".wav")
         logging.info(f"Found {len(chunk_files)} chunk files for merging")
 
-        with open(transcriptions_path, 'r', encoding='utf-8') as f:
-            transcriptions = f.readlines()
-
-        if len(transcriptions) != len(chunk_files):
-            logging.warning(
-                f"Mismatch between the number of transcriptions ({len(transcriptions)}) and chunk files ({len(chunk_files)})."
-            )
-
-        transcription_idx = 0
-        for i, (segment, _, speaker) in enumerate(
-            diarization.itertracks(yield_label=True)
-        ):
-            start = segment.start
-            end = segment.end
-            if transcription_idx < len(transcriptions):
-                speaker_text = transcriptions[transcription_idx].strip()
-                transcription_idx += 1
-            else:
-                speaker_text = "[Transcription missing]"
-
-            merged_output.append(
-                f"[{start:.1f}s - {end:.1f}s] {speaker}: {speaker_text}"
-            )
-
-        merged_output = "\n".join(merged_output)
+        segments = [parse_chunk_filename(chunk_file) for chunk_file in chunk_files]
+        if not segments or None in segments:
+            segments = get_speaker_segments(diarization)
 
         output_file = os.path.join(
             output_dir,
-            os.path.basename(audio_path).replace(".wav", "_merged_output.txt"),
+            os.path.splitext(os.path.basename(audio_path))[0] + "_merged_output.txt",
         )
         ensure_dir(output_dir)
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(merged_output)
+
+        if not segments:
+            logging.warning(f"No speaker segments to merge for {audio_path}")
+            with open(output_file, "w", encoding="utf-8"):
+                pass
+            return ""
+
+        # Read the transcriptions one line at a time and write each merged line as
+        # it is produced, rather than holding the raw lines in memory as well.
+        n_transcriptions = 0
+        with open(transcriptions_path, 'r', encoding='utf-8') as transcriptions, open(
+            output_file, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE
+        ) as f:
+            for start, end, speaker in segments:
+                line = transcriptions.readline()
+                if line:
+                    speaker_text = line.strip()
+                    n_transcriptions += 1
+                else:
+                    speaker_text = "[Transcription missing]"
+
+                entry = f"[{start:.1f}s - {end:.1f}s] {speaker}: {speaker_text}"
+                if merged_output:
+                    f.write("\n")
+                f.write(entry)
+                merged_output.append(entry)
+            n_transcriptions += sum(1 for _ in transcriptions)
+
+        if n_transcriptions != len(chunk_files):
+            logging.warning(
+                f"Mismatch between the number of transcriptions ({n_transcriptions}) and chunk files ({len(chunk_files)})."
+            )
+
         logging.info(f"Merged output saved to {output_file}")
 
-        return merged_output
+        return "\n".join(merged_output)
     except Exception as e:
         logging.error(f"Error merging transcriptions: {str(e)}")
         raise
@@ -86,24 +145,24 @@ def merge_raw_transcriptions(temp_transcriptions_dir, audio_path, transcriptions
         str: Path to the merged transcription file.
     """
     try:
-        merged_text = []
-        transcription_files = sorted(
-            glob(os.path.join(temp_transcriptions_dir, "*.txt")),
-            key=lambda x: int(x.split("_chunk_")[1].split("_")[0]) if "_chunk_" in x else 0
-        )
+        transcription_files = _list_chunk_files(temp_transcriptions_dir, ".txt")
         logging.info(f"Found {len(transcription_files)} transcription files for merging")
 
-        for file in transcription_files:
-            with open(file, "r", encoding="utf-8") as f:
-                merged_text.append(f.read())
-
         merged_output_path = os.path.join(
             transcriptions_dir,
-            os.path.basename(audio_path).replace(".wav", "_transcription.txt"),
+            os.path.splitext(os.path.basename(audio_path))[0] + "_transcription.txt",
         )
         ensure_dir(transcriptions_dir)
-        with open(merged_output_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(merged_text))
+        # Stream each file into the output so memory use does not grow with the
+        # length of the recording.
+        with open(
+            merged_output_path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE
+        ) as out:
+            for i, file in enumerate(transcription_files):
+                if i:
+                    out.write("\n")
+                with open(file, "r", encoding="utf-8") as f:
+                    shutil.copyfileobj(f, out, OUTPUT_BUFFER_SIZE)
         logging.info(f"Raw transcriptions merged and saved to {merged_output_path}")
 
         return merged_output_path
@@ -112,6 +171,7 @@ def merge_raw_transcriptions(temp_transcriptions_dir, audio_path, transcriptions
         raise
 
 if __name__ == "__main__":
+    configure_logging()
     # Example usage and testing
     from pyannote.core import Annotation, Segment
     
@@ -1,58 +1,221 @@
-from pydub import AudioSegment
+import numpy as np
 import os
 import logging
-from app.utils import ensure_dir, safe_file_operation
+import struct
+import sys
+from app.audio_utils import read_wav_samples
+from app.diarization import get_speaker_segments
+from app.utils import configure_logging, ensure_dir, safe_file_operation
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Whisper is trained on 30 second windows, so chunks are sized up to that length.
+MAX_CHUNK_DURATION_S = 30.0
+SILENCE_FRAME_MS = 20
+
+def coalesce_segments(segments, max_duration=MAX_CHUNK_DURATION_S):
+    """
+    Merges consecutive segments of the same speaker into chunks of up to max_duration.
+
+    Args:
+        segments (list): Tuples of (start_time, end_time, speaker_label) in seconds,
+            ordered by start time.
+        max_duration (float): Maximum duration of a merged chunk in seconds.
+
+    Returns:
+        list: The coalesced (start_time, end_time, speaker_label) tuples.
+    """
+    coalesced = []
+    for start, end, speaker in segments:
+        if coalesced:
+            prev_start, prev_end, prev_speaker = coalesced[-1]
+            if speaker == prev_speaker and end - prev_start <= max_duration:
+                coalesced[-1] = (prev_start, max(prev_end, end), speaker)
+                continue
+        coalesced.append((start, end, speaker))
+    return coalesced
+
+def split_at_silence(samples, sample_rate, start, end, max_duration=MAX_CHUNK_DURATION_S):
+    """
+    Splits a long segment into pieces of up to max_duration at its quietest points.
+
+    Each cut is placed at the lowest-energy 20 ms frame in the second half of the
+    remaining window, so words are not cut in the middle.
+
+    Args:
+        samples (numpy.ndarray): Mono samples of the whole recording.
+        sample_rate (int): Sample rate of samples.
+        start (float): Segment start time in seconds.
+        end (float): Segment end time in seconds.
+        max_duration (float): Maximum duration of a piece in seconds.
+
+    Returns:
+        list: Tuples of (start_time, end_time) in seconds.
+    """
+    pieces = []
+    frame = int(sample_rate * SILENCE_FRAME_MS / 1000)
+    while end - start > max_duration:
+        lo = int((start + max_duration / 2) * sample_rate)
+        hi = int((start + max_duration) * sample_rate)
+        window = samples[lo:hi].astype(np.float32)
+        n_frames = len(window) // frame
+        if n_frames == 0:
+            cut = start + max_duration
+        else:
+            energy = np.square(window[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+            cut = (lo + int(np.argmin(energy)) * frame + frame // 2) / sample_rate
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+def parse_chunk_filename(chunk_path):
+    """
+    Recovers the segment a chunk file covers from its filename.
+
+    Args:
+        chunk_path (str): Path to a chunk written by split_audio_by_diarization.
+
+    Returns:
+        tuple: (start_time, end_time, speaker_label) in seconds, or None if the
+        filename does not follow the chunk naming scheme.
+    """
+    name = os.path.splitext(os.path.basename(chunk_path))[0]
+    try:
+        speaker_part = name.rsplit("_speaker_", 1)[1]
+        speaker, chunk_part = speaker_part.rsplit("_chunk_", 1)
+        start, end, _ = chunk_part.split("_")
+        return int(start) / 1000, int(end) / 1000, speaker
+    except (IndexError, ValueError):
+        return None
+
+def write_wav_chunk(chunk_path, samples, sample_rate, first, last, source=None):
+    """
+    Writes samples[first:last] of a 16-bit mono recording as a WAV file.
+
+    When the samples are memory-mapped from an open source file on Linux, the PCM
+    bytes are copied file to file with os.sendfile, so they never pass through user
+    space. Other platforms, and kernels that refuse a regular file as the target,
+    write the slice from memory instead.
+
+    Args:
+        chunk_path (str): Path of the WAV file to write.
+        samples (numpy.ndarray): The recording's int16 samples.
+        sample_rate (int): Sample rate of samples.
+        first (int): Index of the first sample to write.
+        last (int): Index one past the last sample to write.
+        source (file, optional): The recording opened in binary mode, used for
+            the zero-copy path.
+    """
+    last = min(last, len(samples))
+    n_bytes = max(last - first, 0) * 2
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + n_bytes, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", n_bytes,
+    )
+    with open(chunk_path, "wb") as chunk_file:
+        chunk_file.write(header)
+        # sendfile only takes a regular file as its output on Linux; on macOS it
+        # requires a socket.
+        if (
+            source is not None
+            and isinstance(samples, np.memmap)
+            and sys.platform.startswith("linux")
+        ):
+            chunk_file.flush()
+            offset = samples.offset + first * 2
+            try:
+                while n_bytes > 0:
+                    sent = os.sendfile(
+                        chunk_file.fileno(), source.fileno(), offset, n_bytes
+                    )
+                    if sent == 0:
+                        raise IOError(
+                            f"Unexpected end of file while writing {chunk_path}"
+                        )
+                    offset += sent
+                    n_bytes -= sent
+                return
+            except OSError as e:
+                logging.debug("sendfile failed for %s (%s), writing from memory", chunk_path, e)
+                chunk_file.seek(len(header))
+                chunk_file.truncate()
+        chunk_file.write(samples[first:last].tobytes())
 
 @safe_file_operation
-def split_audio_by_diarization(audio_path, diarization, output_dir):
+def split_audio_by_diarization(
+    audio_path, diarization, output_dir, max_chunk_duration=MAX_CHUNK_DURATION_S
+):
     """
     Splits the audio into chunks based on the diarization output.
 
+    Consecutive turns of the same speaker are coalesced into chunks of up to
+    max_chunk_duration seconds, and longer turns are split at silence, so the number
+    of transcription requests scales with audio length rather than turn count.
+
+    The samples are memory-mapped once and each chunk is written as a slice of
+    them, without decoding the file into Python objects (see write_wav_chunk).
+
     Args:
-        audio_path (str): Path to the input audio file.
+        audio_path (str): Path to the input audio file, a 16-bit mono WAV file.
         diarization (pyannote.core.Annotation): Diarization annotation.
         output_dir (str): Directory to save the audio chunks.
+        max_chunk_duration (float): Maximum chunk duration in seconds. Defaults to 30.
 
     Returns:
         list: List of paths to the generated audio chunks.
     """
     ensure_dir(output_dir)
-    audio = AudioSegment.from_wav(audio_path)
+    samples, sample_rate = read_wav_samples(audio_path)
     chunk_files = []
     min_chunk_duration_ms = 100  # Minimum duration for chunks in milliseconds
 
     logging.info(f"Starting to split audio file: {audio_path}")
-    
-    for i, (segment, _, speaker) in enumerate(diarization.itertracks(yield_label=True)):
-        start = int(segment.start * 1000)  # milliseconds
-        end = int(segment.end * 1000)  # milliseconds
-
-        if end - start < min_chunk_duration_ms:
-            logging.warning(
-                f"Skipping short chunk: {start}ms to {end}ms for speaker {speaker}"
-            )
-            continue
-
-        chunk = audio[start:end]
-        chunk_path = os.path.join(
-            output_dir,
-            f"{os.path.basename(audio_path).replace('.wav', '')}_speaker_{speaker}_chunk_{start}_{i}.wav",
-        )
-        chunk.export(chunk_path, format="wav")
-        logging.info(f"Saved audio chunk for Speaker {speaker} to {chunk_path}")
-        chunk_files.append(chunk_path)
+
+    segments = get_speaker_segments(diarization)
+    coalesced = coalesce_segments(segments, max_chunk_duration)
+    logging.info(f"Coalesced {len(segments)} diarization turns into {len(coalesced)} segments")
+
+    stem = os.path.splitext(os.path.basename(audio_path))[0]
+    i = 0
+    with open(audio_path, "rb") as source:
+        for segment_start, segment_end, speaker in coalesced:
+            for piece_start, piece_end in split_at_silence(
+                samples, sample_rate, segment_start, segment_end, max_chunk_duration
+            ):
+                start = int(piece_start * 1000)  # milliseconds
+                end = int(piece_end * 1000)  # milliseconds
+
+                if end - start < min_chunk_duration_ms:
+                    logging.warning(
+                        "Skipping short chunk: %dms to %dms for speaker %s",
+                        start, end, speaker,
+                    )
+                    continue
+
+                chunk_path = os.path.join(
+                    output_dir,
+                    f"{stem}_speaker_{speaker}_chunk_{start}_{end}_{i}.wav",
+                )
+                write_wav_chunk(
+                    chunk_path,
+                    samples,
+                    sample_rate,
+                    start * sample_rate // 1000,
+                    end * sample_rate // 1000,
+                    source,
+                )
+                logging.debug("Saved audio chunk for Speaker %s to %s", speaker, chunk_path)
+                chunk_files.append(chunk_path)
+                i += 1
 
     logging.info(f"Total number of chunks created: {len(chunk_files)}")
     return chunk_files
 
 if __name__ == "__main__":
+    configure_logging()
     # Example usage and testing
     from pyannote.core import Annotation, Segment
-    import numpy as np
     from scipy.io import wavfile
     
     # Create a mock audio file
@@ -1,14 +1,49 @@
 import os
+import time
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+import openai
+import anthropic
 from openai import OpenAI
 from anthropic import Anthropic, HUMAN_PROMPT, AI_PROMPT
 import tiktoken
-from app.utils import chunk_text, read_file, safe_file_operation
-
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+from app.utils import (
+    RateLimiter,
+    configure_logging,
+    ensure_dir,
+    read_file,
+    safe_file_operation,
 )
 
+# Chunk summaries are requested concurrently, up to this many at a time.
+MAX_CONCURRENT_SUMMARIES = 4
+SUMMARY_MAX_ATTEMPTS = 3
+# Text at least this long is tokenized in line-aligned blocks on several threads.
+PARALLEL_ENCODE_MIN_CHARS = 1 << 20
+# With CACHE_SUMMARIES=true, summaries are cached here by prompt and model;
+# SUMMARY_CACHE_DIR overrides the location.
+DEFAULT_SUMMARY_CACHE_DIR = "./cache/summaries"
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """
+    Settings used to summarize with one model.
+
+    Attributes:
+        name (str): The model name.
+        token_limit (int): Token limit for the model's input.
+        api_key (str): API key for the model's provider.
+    """
+    name: str
+    token_limit: int
+    api_key: str
+
 @safe_file_operation
 def load_prompt(prompt_file):
     """
@@ -22,10 +57,109 @@ def load_prompt(prompt_file):
     """
     return read_file(prompt_file)
 
+@lru_cache(maxsize=8)
+def get_encoding(model):
+    """
+    Returns the tiktoken encoding for a model, loading it only once per model.
+
+    Models unknown to tiktoken (e.g. Anthropic models) use the cl100k_base encoding
+    as an approximation.
+
+    Args:
+        model (str): The model name.
+
+    Returns:
+        tiktoken.Encoding: The encoding for the model.
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def encode_text(text, model):
+    """
+    Tokenizes text without special-token handling.
+
+    Long text is cut at line breaks into one block per CPU and the blocks are
+    encoded with encode_ordinary_batch, which runs them on parallel threads
+    outside the GIL. Decoding the concatenated ids gives back the exact text.
+
+    Args:
+        text (str): The text to tokenize.
+        model (str): The model whose tokenizer is used.
+
+    Returns:
+        list: The token ids.
+    """
+    encoding = get_encoding(model)
+    if len(text) < PARALLEL_ENCODE_MIN_CHARS:
+        return encoding.encode_ordinary(text)
+    workers = os.cpu_count() or 1
+    block_size = len(text) // workers + 1
+    blocks = []
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + block_size)
+        end = len(text) if end == -1 else end + 1
+        blocks.append(text[start:end])
+        start = end
+    return list(
+        chain.from_iterable(encoding.encode_ordinary_batch(blocks, num_threads=workers))
+    )
+
+def chunk_by_tokens(text, max_tokens, model):
+    """
+    Splits text into chunks of at most max_tokens tokens.
+
+    The text is tokenized once and the token ids are sliced into windows, so a long
+    transcript is never re-tokenized per chunk. A character can span several
+    tokens, so a window that would end inside one is shortened until its bytes
+    decode as UTF-8.
+
+    Args:
+        text (str): The text to split.
+        max_tokens (int): Maximum number of tokens per chunk.
+        model (str): The model whose tokenizer is used.
+
+    Returns:
+        list: List of text chunks. Text within the limit is returned as a single chunk.
+    """
+    # Every token covers at least one UTF-8 byte and a character is at most four
+    # bytes, so short text is known to fit without tokenizing it.
+    if len(text) * 4 <= max_tokens:
+        return [text]
+    encoding = get_encoding(model)
+    token_ids = encode_text(text, model)
+    if len(token_ids) <= max_tokens:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(token_ids):
+        end = min(start + max_tokens, len(token_ids))
+        while True:
+            data = encoding.decode_bytes(token_ids[start:end])
+            try:
+                chunks.append(data.decode("utf-8"))
+                break
+            except UnicodeDecodeError:
+                if end - start <= 1:
+                    chunks.append(data.decode("utf-8", errors="replace"))
+                    break
+                end -= 1
+        start = end
+    return chunks
+
+TOKEN_COUNT_CACHE_SIZE = 512
+_token_counts = OrderedDict()
+_token_count_lock = threading.Lock()
+
 def count_tokens(text, model):
     """
     Count the number of tokens in the given text.
 
+    Counts are memoized by a hash of the text, so counting the same text again
+    (e.g. chunk summaries seen again by the final summary) skips the encoding.
+
     Args:
         text (str): The text to count tokens for.
         model (str): The model to use for token counting.
@@ -33,12 +167,57 @@ def count_tokens(text, model):
     Returns:
         int: The number of tokens in the text.
     """
+    key = (hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), model)
+    with _token_count_lock:
+        if key in _token_counts:
+            _token_counts.move_to_end(key)
+            return _token_counts[key]
     try:
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
+        n_tokens = len(encode_text(text, model))
+        with _token_count_lock:
+            _token_counts[key] = n_tokens
+            if len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+                _token_counts.popitem(last=False)
+        return n_tokens
     except Exception as e:
         logging.warning(f"Error counting tokens: {str(e)}. Using fallback estimation.")
-        return len(text.split()) * 1.3  # Fallback estimation
+        # Fallback estimation; counting spaces avoids building a list of every word.
+        return int((text.count(" ") + 1) * 1.3)
+
+@lru_cache(maxsize=4)
+def _get_openai_client(api_key):
+    """
+    Returns an OpenAI client for an API key, creating it only once per key.
+
+    Reusing the client keeps its HTTP connection pool, so consecutive summary
+    requests do not each pay for a new TCP and TLS handshake.
+
+    Args:
+        api_key (str): OpenAI API key.
+
+    Returns:
+        OpenAI: The client for the key.
+    """
+    # Retries are handled by _summarize_prompt, so SDK retries would multiply them
+    # and bypass the rate limiter.
+    return OpenAI(api_key=api_key, max_retries=0)
+
+@lru_cache(maxsize=4)
+def _get_anthropic_client(api_key):
+    """
+    Returns an Anthropic client for an API key, creating it only once per key.
+
+    Args:
+        api_key (str): Anthropic API key.
+
+    Returns:
+        Anthropic: The client for the key.
+    """
+    return Anthropic(
+        api_key=api_key,
+        max_retries=0,
+        default_headers={"anthropic-beta": "max-tokens-3-5-sonnet-2024-07-15"},
+    )
 
 def summarize_with_openai(prompt, api_key, model):
     """
@@ -52,7 +231,7 @@ def summarize_with_openai(prompt, api_key, model):
     Returns:
         str: The generated summary.
     """
-    client = OpenAI(api_key=api_key)
+    client = _get_openai_client(api_key)
     try:
         response = client.chat.completions.create(
             model=model,
@@ -61,6 +240,13 @@ def summarize_with_openai(prompt, api_key, model):
                 {"role": "user", "content": prompt},
             ],
         )
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        if details is not None:
+            logging.debug(
+                "OpenAI summarization used %s prompt tokens, %s cached",
+                usage.prompt_tokens, details.cached_tokens,
+            )
         return response.choices[0].message.content.strip()
     except Exception as e:
         logging.error(f"Error in OpenAI summarization: {str(e)}")
@@ -79,25 +265,151 @@ def summarize_with_anthropic(prompt, api_key, model, max_tokens=8192):
     Returns:
         str: The generated summary.
     """
-    client = Anthropic(
-        api_key=api_key,
-        default_headers={"anthropic-beta": "max-tokens-3-5-sonnet-2024-07-15"},
-    )
+    client = _get_anthropic_client(api_key)
 
     try:
-        response = client.messages.create(
+        # Long outputs are streamed so the request is not held open without data
+        # until the whole summary has been generated.
+        with client.messages.stream(
             model=model,
             max_tokens=max_tokens,
             messages=[
                 {"role": "user", "content": f"{HUMAN_PROMPT} {prompt}"},
                 {"role": "assistant", "content": f"{AI_PROMPT}"},
             ],
-        )
-        return response.content[0].text
+        ) as stream:
+            return "".join(stream.text_stream)
     except Exception as e:
         logging.error(f"Error in Anthropic summarization: {str(e)}")
         raise
 
+TRANSCRIPT_PLACEHOLDER = "{{TRANSCRIPT}}"
+
+def build_prompt(prompt_template, transcript, note=""):
+    """
+    Fills a prompt template with a transcript, keeping the invariant text first.
+
+    Providers cache identical prompt prefixes, so the template's instructions are
+    placed before the transcript instead of after it. Unless the template's only
+    placeholder is at its end, every placeholder is replaced by a pointer and the
+    transcript is appended at the end of the prompt.
+
+    Args:
+        prompt_template (str): The prompt template containing {{TRANSCRIPT}}.
+        transcript (str): The transcript text to insert.
+        note (str): Extra instructions appended to the template.
+
+    Returns:
+        str: The prompt to send.
+    """
+    if TRANSCRIPT_PLACEHOLDER not in prompt_template:
+        return prompt_template + note
+    before, _, after = prompt_template.rpartition(TRANSCRIPT_PLACEHOLDER)
+    if not after.strip() and TRANSCRIPT_PLACEHOLDER not in before:
+        return before + transcript + after + note
+    instructions = prompt_template.replace(
+        TRANSCRIPT_PLACEHOLDER, "(the transcript is given at the end of this message)"
+    ) + note
+    return f"{instructions}\n\nTranscript:\n{transcript}"
+
+@lru_cache(maxsize=1)
+def _get_summary_rate_limiter():
+    """
+    Returns the rate limiter shared by all summarization requests in the process.
+
+    Limits come from SUMMARY_RPM and SUMMARY_TPM and are read on first use, after
+    the environment has been loaded. Both default to 0 (no throttling).
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    return RateLimiter(
+        int(os.getenv("SUMMARY_RPM", 0)), int(os.getenv("SUMMARY_TPM", 0))
+    )
+
+def _summary_cache_path(prompt, model):
+    """
+    Returns the cache file path for a summary of a prompt by a model.
+
+    The cache holds transcript-derived text, so it is off unless CACHE_SUMMARIES
+    is set.
+
+    Args:
+        prompt (str): The summarization prompt.
+        model (str): The model name.
+
+    Returns:
+        str: Path of the cache file, or None if the cache is disabled.
+    """
+    if os.getenv("CACHE_SUMMARIES", "").lower() not in ("1", "true", "yes"):
+        return None
+    cache_dir = os.getenv("SUMMARY_CACHE_DIR") or DEFAULT_SUMMARY_CACHE_DIR
+    key = hashlib.blake2b(
+        f"{model}\0{prompt}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return os.path.join(cache_dir, f"{key}.txt")
+
+@safe_file_operation
+def _store_cached_summary(cache_path, summary):
+    """
+    Writes a summary to the cache, replacing the file atomically.
+
+    Args:
+        cache_path (str): Path of the cache file.
+        summary (str): The summary to store.
+    """
+    ensure_dir(os.path.dirname(cache_path))
+    temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(summary)
+    os.replace(temp_path, cache_path)
+
+def _summarize_prompt(prompt, api_key, model):
+    """
+    Sends a summarization prompt to the provider of the given model.
+
+    Rate-limited requests are retried with exponential backoff, so concurrent
+    chunk requests do not fail the whole summary when they hit the limit.
+    When CACHE_SUMMARIES is set, summaries are cached by prompt and model, so a
+    rerun over the same transcript does not request them again.
+
+    Args:
+        prompt (str): The prompt containing the text to summarize.
+        api_key (str): API key for the model's provider.
+        model (str): The model to use for summarization.
+
+    Returns:
+        str: The generated summary.
+    """
+    if "gpt" in model.lower():
+        summarize, rate_limit_error = summarize_with_openai, openai.RateLimitError
+    elif "claude" in model.lower():
+        summarize, rate_limit_error = summarize_with_anthropic, anthropic.RateLimitError
+    else:
+        raise ValueError(f"Unsupported model: {model}")
+
+    cache_path = _summary_cache_path(prompt, model)
+    if cache_path and os.path.exists(cache_path):
+        logging.debug("Using cached summary %s", cache_path)
+        return read_file(cache_path)
+
+    rate_limiter = _get_summary_rate_limiter()
+    tokens = count_tokens(prompt, model) if rate_limiter.tokens_per_minute else 0
+    for attempt in range(SUMMARY_MAX_ATTEMPTS):
+        rate_limiter.acquire(tokens)
+        try:
+            summary = summarize(prompt, api_key, model)
+        except rate_limit_error:
+            if attempt == SUMMARY_MAX_ATTEMPTS - 1:
+                raise
+            delay = 2 ** attempt
+            logging.warning("Summarization rate limited, retrying in %ds", delay)
+            time.sleep(delay)
+        else:
+            if cache_path:
+                _store_cached_summary(cache_path, summary)
+            return summary
+
 def summarize_transcript(
     transcript, prompt_file, api_key, model, token_limit, is_final_summary=False
 ):
@@ -121,31 +433,38 @@ def summarize_transcript(
 
         prompt_template = load_prompt(prompt_file)
         chunk_limit = token_limit - 1000  # Leave room for the prompt
-        chunks = chunk_text(transcript, chunk_limit)
+        chunks = chunk_by_tokens(transcript, chunk_limit, model)
         summaries = []
 
+        chunk_prompts = []
         for i, chunk in enumerate(chunks):
-            chunk_prompt = prompt_template.replace("{{TRANSCRIPT}}", chunk)
+            note = ""
             if i > 0 or is_final_summary:
-                chunk_prompt += "\n\nNote: This is a continuation or combination of previous summaries. Please provide a coherent and comprehensive summary."
-
-            if "gpt" in model.lower():
-                summary = summarize_with_openai(chunk_prompt, api_key, model)
-            elif "claude" in model.lower():
-                summary = summarize_with_anthropic(chunk_prompt, api_key, model)
-            else:
-                raise ValueError(f"Unsupported model: {model}")
+                note = "\n\nNote: This is a continuation or combination of previous summaries. Please provide a coherent and comprehensive summary."
+            chunk_prompts.append(build_prompt(prompt_template, chunk, note))
 
-            summaries.append(summary)
+        if len(chunk_prompts) == 1:
+            summaries.append(_summarize_prompt(chunk_prompts[0], api_key, model))
+        else:
+            logging.info(
+                f"Transcript exceeds the token limit, summarizing {len(chunk_prompts)} chunks"
+            )
+            # The chunk prompts are independent, so their requests run concurrently.
+            with ThreadPoolExecutor(
+                max_workers=min(MAX_CONCURRENT_SUMMARIES, len(chunk_prompts))
+            ) as executor:
+                summaries.extend(
+                    executor.map(
+                        lambda prompt: _summarize_prompt(prompt, api_key, model),
+                        chunk_prompts,
+                    )
+                )
 
         # Combine summaries if there are multiple chunks
         if len(summaries) > 1:
             combined_summary = "\n\n".join(summaries)
             final_prompt = f"Please provide a concise and coherent summary of the following combined summaries:\n\n{combined_summary}"
-            if "gpt" in model.lower():
-                final_summary = summarize_with_openai(final_prompt, api_key, model)
-            else:
-                final_summary = summarize_with_anthropic(final_prompt, api_key, model)
+            final_summary = _summarize_prompt(final_prompt, api_key, model)
         else:
             final_summary = summaries[0]
 
@@ -156,6 +475,7 @@ def summarize_transcript(
         raise
 
 if __name__ == "__main__":
+    configure_logging()
     # Example usage and testing
     from dotenv import load_dotenv
 
@@ -1,14 +1,137 @@
 import whisper
 import torch
 import os
+import time
+import asyncio
 import logging
+import threading
 import openai
-from app.utils import ensure_dir, safe_file_operation
+import numpy as np
+from functools import lru_cache
+from app.audio_utils import read_wav_samples
+from app.utils import (
+    RateLimiter,
+    configure_logging,
+    ensure_dir,
+    read_file,
+    safe_file_operation,
+)
+
+WHISPER_MODEL_NAME = "base"
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+# Rate limits, server errors and dropped connections are retried with exponential
+# backoff; other API errors (e.g. authentication) fail immediately.
+OPENAI_MAX_ATTEMPTS = 3
+_RETRYABLE_OPENAI_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
 )
 
+# Whisper installs per-call decoding hooks on the shared model, so only one
+# transcription may run on it at a time, even when files are processed in parallel.
+_whisper_lock = threading.Lock()
+
+@lru_cache(maxsize=2)
+def _get_whisper_model(name, device):
+    """
+    Loads a Whisper model once per process and reuses it for later calls.
+
+    Args:
+        name (str): Name of the Whisper model.
+        device (str): Device to load the model on ("cuda" or "cpu").
+
+    Returns:
+        whisper.Whisper: The loaded model.
+    """
+    logging.info(f"Loading Whisper model '{name}' on {device}")
+    return whisper.load_model(name, device=device)
+
+def _use_faster_whisper():
+    """
+    Checks whether local transcription should use faster-whisper.
+
+    faster-whisper runs the same Whisper models through CTranslate2 with int8
+    quantization. It is an optional dependency, selected with
+    WHISPER_BACKEND=faster-whisper.
+
+    Returns:
+        bool: True if the faster-whisper backend is selected.
+    """
+    return os.getenv("WHISPER_BACKEND", "whisper").lower() == "faster-whisper"
+
+@lru_cache(maxsize=2)
+def _get_faster_whisper_model(name, device):
+    """
+    Loads a faster-whisper model once per process and reuses it for later calls.
+
+    Args:
+        name (str): Name of the Whisper model.
+        device (str): Device to load the model on ("cuda" or "cpu").
+
+    Returns:
+        faster_whisper.WhisperModel: The loaded model.
+    """
+    from faster_whisper import WhisperModel
+
+    compute_type = "int8_float16" if device == "cuda" else "int8"
+    logging.info(f"Loading faster-whisper model '{name}' on {device} ({compute_type})")
+    return WhisperModel(name, device=device, compute_type=compute_type)
+
+def _transcribe_with_faster_whisper(model, audio_path):
+    """
+    Transcribes an audio file with a faster-whisper model.
+
+    Args:
+        model (faster_whisper.WhisperModel): The loaded model.
+        audio_path (str): Path to the audio file.
+
+    Returns:
+        str: The transcribed text.
+    """
+    segments, _ = model.transcribe(audio_path, beam_size=1, vad_filter=True)
+    return "".join(segment.text for segment in segments)
+
+def get_transcription_path(audio_path, output_dir):
+    """
+    Returns the path the transcription of an audio chunk is saved to.
+
+    Args:
+        audio_path (str): Path to the audio chunk.
+        output_dir (str): Directory the transcription is saved in.
+
+    Returns:
+        str: Path to the transcription file.
+    """
+    return os.path.join(
+        output_dir,
+        os.path.splitext(os.path.basename(audio_path))[0] + "_transcription.txt",
+    )
+
+def _save_transcription(audio_path, output_dir, text):
+    """
+    Writes the transcription of an audio chunk next to its siblings in output_dir.
+
+    Args:
+        audio_path (str): Path to the transcribed audio chunk.
+        output_dir (str): Directory to save the transcription.
+        text (str): The transcribed text.
+
+    Returns:
+        str: Path to the written transcription file.
+    """
+    output_file = get_transcription_path(audio_path, output_dir)
+    ensure_dir(output_dir)
+    # The text is written to a temporary file and renamed into place, so an
+    # interrupted run never leaves a partial transcription that a rerun would
+    # take as finished.
+    temp_file = output_file + ".part"
+    # Encode once and write the bytes in a single call through a 64 KiB buffer.
+    with open(temp_file, "wb", buffering=1 << 16) as f:
+        f.write(text.encode("utf-8"))
+    os.replace(temp_file, output_file)
+    return output_file
+
 @safe_file_operation
 def transcribe_audio(audio_path, output_dir, openai_api_key):
     """
@@ -23,27 +146,78 @@ def transcribe_audio(audio_path, output_dir, openai_api_key):
         str: The transcribed text.
     """
     try:
-        logging.info(f"Starting transcription for {audio_path}")
+        logging.debug("Starting transcription for %s", audio_path)
         device = "cuda" if torch.cuda.is_available() else "cpu"
-        model = whisper.load_model("base", device=device)
-        result = model.transcribe(audio_path)
-        full_transcription = result["text"]
+        if _use_faster_whisper():
+            model = _get_faster_whisper_model(WHISPER_MODEL_NAME, device)
+            with _whisper_lock:
+                full_transcription = _transcribe_with_faster_whisper(model, audio_path)
+        else:
+            model = _get_whisper_model(WHISPER_MODEL_NAME, device)
+            with _whisper_lock:
+                result = model.transcribe(audio_path)
+            full_transcription = result["text"]
 
-        output_file = os.path.join(
-            output_dir,
-            os.path.basename(audio_path).replace(".wav", "_transcription.txt"),
-        )
-        ensure_dir(output_dir)
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(full_transcription)
+        output_file = _save_transcription(audio_path, output_dir, full_transcription)
 
-        logging.info(f"Transcription saved for {audio_path} to {output_file}")
+        logging.debug("Transcription saved for %s to %s", audio_path, output_file)
         return full_transcription
 
     except Exception as e:
         logging.error(f"Error in transcription for {audio_path}: {str(e)}")
         raise
 
+@lru_cache(maxsize=4)
+def _get_openai_client(api_key):
+    """
+    Returns an OpenAI client for an API key, creating it only once per key.
+
+    Chunks are uploaded one request each, so reusing the client's connection pool
+    saves a TCP and TLS handshake per chunk.
+
+    Args:
+        api_key (str): OpenAI API key.
+
+    Returns:
+        openai.OpenAI: The client for the key.
+    """
+    # Retries are handled by the caller so the backoff schedule is explicit.
+    return openai.OpenAI(api_key=api_key, max_retries=0)
+
+@lru_cache(maxsize=1)
+def _get_transcription_rate_limiter():
+    """
+    Returns the rate limiter shared by all OpenAI transcription requests.
+
+    The limit comes from TRANSCRIPTION_RPM and is read on first use, after the
+    environment has been loaded. It defaults to 0 (no throttling).
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    return RateLimiter(int(os.getenv("TRANSCRIPTION_RPM", 0)))
+
+def _retry_delay(error, attempt):
+    """
+    Returns how long to wait before retrying a failed OpenAI request.
+
+    The server's Retry-After header is honoured when the response carries one;
+    otherwise the delay grows exponentially with the attempt number.
+
+    Args:
+        error (Exception): The error raised by the request.
+        attempt (int): Zero-based number of the failed attempt.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return 2 ** attempt
+
 @safe_file_operation
 def transcribe_audio_with_openai(audio_path, output_dir, openai_api_key):
     """
@@ -58,31 +232,149 @@ def transcribe_audio_with_openai(audio_path, output_dir, openai_api_key):
         str: The transcribed text.
     """
     try:
-        logging.info(f"Starting OpenAI transcription for {audio_path}")
-        client = openai.OpenAI(api_key=openai_api_key)
+        logging.debug("Starting OpenAI transcription for %s", audio_path)
+        client = _get_openai_client(openai_api_key)
+        rate_limiter = _get_transcription_rate_limiter()
 
-        with open(audio_path, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                model="whisper-1", file=audio_file
-            )
+        for attempt in range(OPENAI_MAX_ATTEMPTS):
+            rate_limiter.acquire()
+            try:
+                with open(audio_path, "rb") as audio_file:
+                    transcription = client.audio.transcriptions.create(
+                        model="whisper-1", file=audio_file
+                    )
+                break
+            except _RETRYABLE_OPENAI_ERRORS as e:
+                if attempt == OPENAI_MAX_ATTEMPTS - 1:
+                    raise
+                delay = _retry_delay(e, attempt)
+                logging.warning(
+                    "OpenAI transcription of %s failed (%s), retrying in %.1fs",
+                    audio_path, e, delay,
+                )
+                time.sleep(delay)
 
         full_transcription = transcription.text
 
-        output_file = os.path.join(
-            output_dir,
-            os.path.basename(audio_path).replace(".wav", "_transcription.txt"),
-        )
-        ensure_dir(output_dir)
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(full_transcription)
+        output_file = _save_transcription(audio_path, output_dir, full_transcription)
 
-        logging.info(f"OpenAI transcription saved for {audio_path} to {output_file}")
+        logging.debug("OpenAI transcription saved for %s to %s", audio_path, output_file)
         return full_transcription
 
     except Exception as e:
         logging.error(f"Error in OpenAI transcription for {audio_path}: {str(e)}")
         raise
 
+def _load_chunk_audio(chunk_path):
+    """
+    Loads an audio chunk as float32 samples in [-1, 1] at Whisper's sample rate.
+
+    Chunks written by split_audio_by_diarization already are 16 kHz mono PCM, so
+    they are read directly instead of being decoded by an ffmpeg process per chunk.
+
+    Args:
+        chunk_path (str): Path to the audio chunk.
+
+    Returns:
+        numpy.ndarray: The float32 samples.
+    """
+    samples, sample_rate = read_wav_samples(chunk_path)
+    if sample_rate != whisper.audio.SAMPLE_RATE:
+        return whisper.load_audio(chunk_path)
+    return samples.astype(np.float32) / 32768.0
+
+def _decode_batch(model, chunk_paths, options):
+    """
+    Decodes a batch of audio chunks with a single Whisper forward pass.
+
+    Chunks longer than Whisper's 30 second window fall back to model.transcribe
+    so they are not truncated.
+
+    Args:
+        model (whisper.Whisper): The loaded Whisper model.
+        chunk_paths (list): Paths to the audio chunks.
+        options (whisper.DecodingOptions): Decoding options for the batch.
+
+    Returns:
+        list: The transcribed text for each chunk, in input order.
+    """
+    texts = [None] * len(chunk_paths)
+    short_idx, mels = [], []
+    for i, chunk_path in enumerate(chunk_paths):
+        audio = _load_chunk_audio(chunk_path)
+        if len(audio) > whisper.audio.N_SAMPLES:
+            texts[i] = model.transcribe(audio)["text"]
+            continue
+        short_idx.append(i)
+        mels.append(
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(audio), n_mels=model.dims.n_mels
+            )
+        )
+
+    if mels:
+        results = model.decode(torch.stack(mels).to(model.device), options)
+        for i, result in zip(short_idx, results):
+            texts[i] = result.text
+
+    return texts
+
+@safe_file_operation
+def transcribe_many(chunk_files, output_dir, batch_size=16):
+    """
+    Transcribes many audio chunks with local Whisper using batched decoding.
+
+    Chunks are sorted by size so that each batch holds similarly long audio, which
+    keeps padding to a minimum. Chunks that fit in Whisper's 30 second window are
+    decoded together in a single forward pass.
+
+    If a batch fails, its chunks are transcribed again one at a time, so a single
+    bad chunk does not lose the rest of the batch.
+
+    Args:
+        chunk_files (list): Paths to the audio chunks.
+        output_dir (str): Directory to save the transcriptions.
+        batch_size (int): Number of chunks decoded per forward pass. Defaults to 16.
+
+    Returns:
+        list: The transcribed text for each chunk, in input order.
+
+    Raises:
+        Exception: The error of a chunk that could not be transcribed on its own.
+    """
+    if _use_faster_whisper():
+        # faster-whisper batches internally, so chunks are transcribed one by one.
+        return [transcribe_audio(chunk_file, output_dir, None) for chunk_file in chunk_files]
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = _get_whisper_model(WHISPER_MODEL_NAME, device)
+    options = whisper.DecodingOptions(fp16=device == "cuda")
+
+    order = sorted(range(len(chunk_files)), key=lambda i: os.path.getsize(chunk_files[i]))
+    texts = [None] * len(chunk_files)
+
+    for batch_start in range(0, len(order), batch_size):
+        batch = order[batch_start:batch_start + batch_size]
+        logging.info(
+            f"Transcribing batch of {len(batch)} chunks "
+            f"({batch_start + len(batch)}/{len(order)})"
+        )
+        try:
+            with _whisper_lock:
+                texts_batch = _decode_batch(model, [chunk_files[i] for i in batch], options)
+            for i, text in zip(batch, texts_batch):
+                texts[i] = text
+                _save_transcription(chunk_files[i], output_dir, text)
+        except Exception as e:
+            logging.error(
+                f"Error in batched transcription: {str(e)}. "
+                "Transcribing the batch one chunk at a time."
+            )
+            for i in batch:
+                texts[i] = transcribe_audio(chunk_files[i], output_dir, None)
+
+    return texts
+
 def transcribe_chunk(chunk_path, output_dir, openai_api_key, use_openai):
     """
     Transcribes a single audio chunk using either local Whisper or OpenAI's API.
@@ -101,7 +393,108 @@ def transcribe_chunk(chunk_path, output_dir, openai_api_key, use_openai):
     else:
         return transcribe_audio(chunk_path, output_dir, openai_api_key)
 
+async def _transcribe_chunks_async(
+    chunk_files, output_dir, openai_api_key, use_openai, max_concurrent
+):
+    """
+    Dispatches chunk transcriptions concurrently, bounded by a semaphore.
+
+    Args:
+        chunk_files (list): Paths to the audio chunks.
+        output_dir (str): Directory to save the transcriptions.
+        openai_api_key (str): OpenAI API key.
+        use_openai (bool): Whether to use OpenAI for transcription.
+        max_concurrent (int): Maximum number of chunks transcribed at once.
+
+    Returns:
+        list: Transcribed text or the raised exception for each chunk, in input order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _transcribe_one(chunk_file):
+        async with semaphore:
+            return await asyncio.to_thread(
+                transcribe_chunk, chunk_file, output_dir, openai_api_key, use_openai
+            )
+
+    return await asyncio.gather(
+        *[_transcribe_one(chunk_file) for chunk_file in chunk_files],
+        return_exceptions=True,
+    )
+
+def transcribe_chunks(
+    chunk_files,
+    output_dir,
+    openai_api_key,
+    use_openai,
+    max_concurrent=5,
+    batch_size=16,
+    reuse_existing=False,
+):
+    """
+    Transcribes a list of audio chunks.
+
+    OpenAI requests are dispatched concurrently; local Whisper decodes the chunks in
+    batches. The chunks are merged with their transcriptions by position, so a
+    chunk that cannot be transcribed fails the whole file instead of shifting every
+    later line onto the wrong speaker. The other chunks still run to completion and
+    are saved, so a rerun with reuse_existing only transcribes the failed ones.
+
+    Args:
+        chunk_files (list): Paths to the audio chunks.
+        output_dir (str): Directory to save the transcriptions.
+        openai_api_key (str): OpenAI API key.
+        use_openai (bool): Whether to use OpenAI for transcription.
+        max_concurrent (int): Maximum number of concurrent OpenAI requests. Defaults to 5.
+        batch_size (int): Number of chunks per local Whisper batch. Defaults to 16.
+        reuse_existing (bool): Whether to reuse transcriptions already saved in
+            output_dir by an earlier run instead of transcribing those chunks again.
+
+    Returns:
+        list: The transcribed texts, in the same order as chunk_files.
+
+    Raises:
+        RuntimeError: If any chunk could not be transcribed with OpenAI. Local
+            Whisper raises the error of the chunk that failed.
+    """
+    results_by_chunk = {}
+    if reuse_existing:
+        for chunk_file in chunk_files:
+            transcription_file = get_transcription_path(chunk_file, output_dir)
+            if os.path.exists(transcription_file):
+                results_by_chunk[chunk_file] = read_file(transcription_file)
+        if results_by_chunk:
+            logging.info(f"Reusing {len(results_by_chunk)} existing transcriptions")
+
+    pending = [c for c in chunk_files if c not in results_by_chunk]
+    if pending:
+        if use_openai:
+            results = asyncio.run(
+                _transcribe_chunks_async(
+                    pending, output_dir, openai_api_key, use_openai, max(1, max_concurrent)
+                )
+            )
+        else:
+            results = transcribe_many(pending, output_dir, batch_size)
+        results_by_chunk.update(zip(pending, results))
+
+    transcriptions = []
+    failures = []
+    for chunk_file in chunk_files:
+        result = results_by_chunk[chunk_file]
+        if isinstance(result, Exception):
+            logging.error(f"Transcription failed for {chunk_file}: {str(result)}")
+            failures.append(result)
+        else:
+            transcriptions.append(result)
+    if failures:
+        raise RuntimeError(
+            f"Transcription failed for {len(failures)} of {len(chunk_files)} chunks"
+        ) from failures[0]
+    return transcriptions
+
 if __name__ == "__main__":
+    configure_logging()
     # Example usage and testing
     from dotenv import load_dotenv
     load_dotenv()
@@ -1,24 +1,62 @@
 import os
+import re
+import json
 import uuid
+import struct
 import time
 from datetime import datetime, timedelta
 import subprocess
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from slugify import slugify
 import shutil
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Directories already ensured in this process, so repeat calls skip the filesystem.
+_ensured_dirs = set()
+_ensured_dirs_lock = threading.Lock()
 
 def ensure_dir(directory):
     """
     Ensures the specified directory exists, creating it if necessary.
 
+    Each directory is only checked once per process; later calls return without
+    touching the filesystem. When the parent has already been ensured, only the
+    leaf is created, without os.makedirs walking the ancestors again.
+
     Args:
         directory (str): The path to the directory.
     """
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        logging.info(f"Created directory: {directory}")
+    if directory in _ensured_dirs:
+        return
+    with _ensured_dirs_lock:
+        if directory in _ensured_dirs:
+            return
+        try:
+            if os.path.dirname(directory) in _ensured_dirs:
+                os.mkdir(directory)
+            else:
+                os.makedirs(directory)
+            logging.info(f"Created directory: {directory}")
+        except FileExistsError:
+            pass
+        _ensured_dirs.add(directory)
+
+def configure_logging(level=logging.INFO):
+    """
+    Configures console logging for running a module on its own.
+
+    The application entry point (main.py) sets up its own file logging instead, so
+    modules do not configure logging when they are imported.
+
+    Args:
+        level (int): Logging level. Defaults to logging.INFO.
+    """
+    logging.basicConfig(level=level, format=LOG_FORMAT)
 
 def cleanup_old_logs(logs_dir, max_age_days=30):
     """
@@ -28,14 +66,14 @@ def cleanup_old_logs(logs_dir, max_age_days=30):
         logs_dir (str): The directory containing log files.
         max_age_days (int): The maximum age of log files in days.
     """
-    current_time = time.time()
-    for filename in os.listdir(logs_dir):
-        file_path = os.path.join(logs_dir, filename)
-        if os.path.isfile(file_path):
-            file_age = current_time - os.path.getmtime(file_path)
-            if file_age > max_age_days * 86400:  # 86400 seconds in a day
-                os.remove(file_path)
-                logging.info(f"Removed old log file: {filename}")
+    cutoff = time.time() - max_age_days * 86400  # 86400 seconds in a day
+    with os.scandir(logs_dir) as entries:
+        for entry in entries:
+            # The entry type comes from the directory listing and its stat result
+            # is cached, so each file costs at most one stat call.
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                logging.info(f"Removed old log file: {entry.name}")
 
 def format_seconds(seconds):
     """
@@ -87,6 +125,34 @@ def get_file_size(file_path):
     """
     return os.path.getsize(file_path) / (1024 * 1024)
 
+def is_up_to_date(output_path, source_path):
+    """
+    Checks whether an output file exists and is at least as new as its source.
+
+    Args:
+        output_path (str): Path to the generated file.
+        source_path (str): Path to the file it was generated from.
+
+    Returns:
+        bool: True if output_path can be reused, False otherwise.
+    """
+    try:
+        return os.path.getmtime(output_path) >= os.path.getmtime(source_path)
+    except OSError:
+        return False
+
+# Characters slugify replaces in filenames, compiled once instead of on every call.
+_DISALLOWED_FILENAME_CHARS = re.compile(r"[^\w.-]")
+# Names slugify would return unchanged, so already sanitized names skip it.
+_SANE_FILENAME = re.compile(r"(?!.*--)[a-z0-9_][a-z0-9_.-]*(?<![.-])")
+# For printable ASCII, slugify only lowercases and turns disallowed characters into
+# dashes, unless the name holds a quote, an HTML entity or a comma between digits.
+_ASCII_SLUG_TABLE = str.maketrans(
+    {c: "-" for c in map(chr, range(128)) if not (c.isalnum() or c in "_.-")}
+)
+_SLUGIFY_SPECIAL_CHARS = frozenset("'&,")
+_DUPLICATE_DASHES = re.compile(r"-{2,}")
+
 def sanitize_filename(name, max_length=242):
     """
     Sanitizes a string to be used as a filename, ensuring cross-platform compatibility.
@@ -98,10 +164,23 @@ def sanitize_filename(name, max_length=242):
     Returns:
         str: The sanitized filename.
     """
-    safe_name = slugify(name, lowercase=True, regex_pattern=r"[^\w.-]")
-    safe_name = safe_name.strip(".")
-    if not safe_name:
-        safe_name = "unnamed_file"
+    if _SANE_FILENAME.fullmatch(name):
+        safe_name = name
+    else:
+        if (
+            name.isascii()
+            and name.isprintable()
+            and _SLUGIFY_SPECIAL_CHARS.isdisjoint(name)
+        ):
+            safe_name = name.translate(_ASCII_SLUG_TABLE).lower()
+            safe_name = _DUPLICATE_DASHES.sub("-", safe_name).strip("-")
+        else:
+            safe_name = slugify(
+                name, lowercase=True, regex_pattern=_DISALLOWED_FILENAME_CHARS
+            )
+        safe_name = safe_name.strip(".")
+        if not safe_name:
+            safe_name = "unnamed_file"
     root, ext = os.path.splitext(safe_name)
     max_root_length = max_length - len(ext) - 1
     if len(root) > max_root_length:
@@ -118,11 +197,12 @@ def list_available_prompts(prompts_dir):
     Returns:
         list: A list of available prompt file paths.
     """
-    return [
-        os.path.join(prompts_dir, file)
-        for file in os.listdir(prompts_dir)
-        if file.endswith(".txt")
-    ]
+    with os.scandir(prompts_dir) as entries:
+        return [
+            entry.path
+            for entry in entries
+            if entry.name.endswith(".txt") and entry.is_file()
+        ]
 
 def select_prompt(prompts):
     """
@@ -147,7 +227,7 @@ def select_prompt(prompts):
         except ValueError:
             print("Invalid input. Please enter a number.")
 
-def create_output_dirs(base_output_dir, normalized_date, recording_name):
+def create_output_dirs(base_output_dir, normalized_date, recording_name, temp_id=None):
     """
     Creates necessary output directories for processing and storing results.
 
@@ -155,54 +235,228 @@ def create_output_dirs(base_output_dir, normalized_date, recording_name):
         base_output_dir (str): The base directory for outputs.
         normalized_date (str): The normalized date string.
         recording_name (str): The sanitized recording name.
+        temp_id (str, optional): Name of the temporary working directory. Defaults to a
+            random id; pass a stable id to find the same intermediates again on a rerun.
 
     Returns:
         dict: A dictionary with paths to the created directories.
     """
     output_dir = os.path.join(base_output_dir, f"{normalized_date}-{recording_name}")
-    unique_id = str(uuid.uuid4())[:8]
+    unique_id = temp_id or str(uuid.uuid4())[:8]
+    temp_dir = os.path.join("./temp", unique_id)
     dirs = {
         "transcriptions": os.path.join(output_dir, "transcriptions"),
         "diarizations": os.path.join(output_dir, "diarizations"),
         "merged_output": os.path.join(output_dir, "merged_output"),
         "summary": os.path.join(output_dir, "summary"),
         "figures": os.path.join(output_dir, "figures"),
-        "temp_wav": os.path.join("./temp", unique_id, "wav_files"),
-        "temp_chunks": os.path.join("./temp", unique_id, "chunks"),
-        "temp_transcriptions": os.path.join("./temp", unique_id, "transcriptions"),
+        "temp_wav": os.path.join(temp_dir, "wav_files"),
+        "temp_chunks": os.path.join(temp_dir, "chunks"),
+        "temp_transcriptions": os.path.join(temp_dir, "transcriptions"),
     }
-    for directory in dirs.values():
+    # The shared parents are ensured first, so each leaf is a single mkdir.
+    for directory in (output_dir, temp_dir, *dirs.values()):
         ensure_dir(directory)
     return dirs
 
-def get_audio_metadata(file_path):
+# Extensions of ISO base media (MP4/QuickTime) files, whose creation time is read
+# directly from the movie header instead of starting ffprobe.
+MP4_EXTENSIONS = {".m4a", ".mp4", ".mov"}
+# Epoch of MP4 timestamps.
+MP4_EPOCH = datetime(1904, 1, 1)
+
+def _iter_boxes(file, end):
     """
-    Retrieves the recording date from the audio file's metadata using ffprobe.
+    Yields the boxes of an ISO base media file between the current offset and end.
+
+    Args:
+        file: The file object, positioned at the first box.
+        end (int): Offset where the enclosing box ends.
+
+    Yields:
+        tuple: (box_type, payload_offset, box_end) for each box.
+    """
+    offset = file.tell()
+    while offset + 8 <= end:
+        file.seek(offset)
+        size, box_type = struct.unpack(">I4s", file.read(8))
+        payload_offset = offset + 8
+        if size == 1:
+            size = struct.unpack(">Q", file.read(8))[0]
+            payload_offset += 8
+        elif size == 0:
+            size = end - offset
+        if size < payload_offset - offset:
+            return
+        yield box_type, payload_offset, offset + size
+        offset += size
+
+def _read_mp4_creation_time(file_path):
+    """
+    Reads the creation time from the movie header (mvhd) of an MP4/M4A file.
+
+    This is the value ffprobe reports as creation_time, so reading it directly
+    yields the same date without a subprocess.
 
     Args:
         file_path (str): The path to the audio file.
 
     Returns:
-        str: The recording date in YYYY-MM-DD format, or today's date if unavailable.
+        datetime: The creation time in UTC, None if the header leaves it unset, or
+            False if no movie header was found.
+    """
+    with open(file_path, "rb") as file:
+        file_size = os.fstat(file.fileno()).st_size
+        for box_type, payload_offset, box_end in _iter_boxes(file, file_size):
+            if box_type != b"moov":
+                continue
+            file.seek(payload_offset)
+            for child_type, child_offset, _ in _iter_boxes(file, box_end):
+                if child_type != b"mvhd":
+                    continue
+                file.seek(child_offset)
+                version = file.read(4)[0]
+                if version == 1:
+                    creation = struct.unpack(">Q", file.read(8))[0]
+                else:
+                    creation = struct.unpack(">I", file.read(4))[0]
+                if not creation:
+                    return None
+                return MP4_EPOCH + timedelta(seconds=creation)
+    return False
+
+# Recording dates read from file metadata, keyed by path, mtime and size, so
+# reruns over unchanged files neither parse them nor start ffprobe again.
+METADATA_CACHE_FILE = "./cache/metadata.json"
+_metadata_cache = None
+_metadata_cache_dirty = False
+_metadata_cache_lock = threading.Lock()
+
+def _get_metadata_cache():
+    """
+    Returns the metadata cache, loading it from disk on first use.
+
+    Returns:
+        dict: Recording dates (or None) keyed by file identity.
+    """
+    global _metadata_cache
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            try:
+                with open(METADATA_CACHE_FILE, "r", encoding="utf-8") as file:
+                    _metadata_cache = json.load(file)
+            except (OSError, ValueError):
+                _metadata_cache = {}
+        return _metadata_cache
+
+def _store_metadata(key, date):
+    """
+    Records a recording date in the metadata cache without saving it.
+
+    Args:
+        key (str): The file identity key.
+        date (str): The recording date, or None if the metadata has none.
+    """
+    global _metadata_cache_dirty
+    cache = _get_metadata_cache()
+    with _metadata_cache_lock:
+        cache[key] = date
+        _metadata_cache_dirty = True
+
+def _save_metadata_cache():
+    """
+    Saves the metadata cache atomically if it has unsaved entries.
+    """
+    global _metadata_cache_dirty
+    with _metadata_cache_lock:
+        if not _metadata_cache_dirty:
+            return
+        try:
+            ensure_dir(os.path.dirname(METADATA_CACHE_FILE))
+            temp_file = f"{METADATA_CACHE_FILE}.{os.getpid()}.part"
+            with open(temp_file, "w", encoding="utf-8") as file:
+                json.dump(_metadata_cache, file)
+            os.replace(temp_file, METADATA_CACHE_FILE)
+            _metadata_cache_dirty = False
+        except OSError as e:
+            logging.debug("Could not save metadata cache: %s", e)
+
+# ffprobe arguments that print only the creation_time tag of the container.
+# creation_time is a container tag, so stream probing is skipped.
+FFPROBE_CREATION_TIME_ARGS = (
+    "ffprobe",
+    "-v", "error",
+    "-probesize", "32k",
+    "-analyzeduration", "0",
+    "-show_entries", "format_tags=creation_time",
+    "-of", "default=nw=1:nk=1",
+)
+
+def _probe_creation_time(file_path):
+    """
+    Reads the creation time tag of an audio file with ffprobe.
+
+    Args:
+        file_path (str): The path to the audio file.
+
+    Returns:
+        datetime: The creation time, or None if it is unavailable.
     """
     try:
         result = subprocess.run(
-            [
-                "ffprobe",
-                "-v", "error",
-                "-show_entries", "format_tags=creation_time",
-                "-of", "default=nw=1:nk=1",
-                file_path,
-            ],
+            (*FFPROBE_CREATION_TIME_ARGS, file_path),
             capture_output=True,
             text=True,
             check=True,
         )
         date = result.stdout.strip()
         if date:
-            return datetime.strptime(date, "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%Y-%m-%d")
+            # ffprobe prints ISO 8601 timestamps, e.g. 2024-05-06T07:08:09.000000Z.
+            return datetime.fromisoformat(date.rstrip("Z"))
     except (subprocess.CalledProcessError, ValueError) as e:
         logging.warning(f"Error retrieving metadata for {file_path}: {str(e)}. Trying file system dates.")
+    return None
+
+def get_audio_metadata(file_path, save_cache=True):
+    """
+    Retrieves the recording date from the audio file's metadata using ffprobe.
+
+    MP4/M4A files have their creation time read directly from the container, so
+    ffprobe is only started for other formats. Results are cached on disk by path,
+    modification time and size.
+
+    Args:
+        file_path (str): The path to the audio file.
+        save_cache (bool): Whether to save a new cache entry to disk right away
+            (default True). Batch lookups save the cache once at the end instead.
+
+    Returns:
+        str: The recording date in YYYY-MM-DD format, or today's date if unavailable.
+    """
+    try:
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    except OSError:
+        key = None
+    cache = _get_metadata_cache()
+    if key in cache:
+        date = cache[key]
+    else:
+        creation_time = False
+        if os.path.splitext(file_path)[1].lower() in MP4_EXTENSIONS:
+            try:
+                creation_time = _read_mp4_creation_time(file_path)
+            except (OSError, struct.error, IndexError, OverflowError) as e:
+                logging.debug("Could not read MP4 header of %s: %s", file_path, e)
+        if creation_time is False:
+            creation_time = _probe_creation_time(file_path)
+        date = creation_time.strftime("%Y-%m-%d") if creation_time else None
+        if key:
+            _store_metadata(key, date)
+            if save_cache:
+                _save_metadata_cache()
+    if date:
+        return date
 
     try:
         stat = os.stat(file_path)
@@ -212,6 +466,36 @@ def get_audio_metadata(file_path):
         logging.warning(f"Error retrieving file system date for {file_path}: {str(e)}. Using current date.")
         return datetime.now().strftime("%Y-%m-%d")
 
+def get_audio_metadata_batch(file_paths, max_workers=16):
+    """
+    Retrieves the recording dates of several audio files in parallel.
+
+    Reading metadata is dominated by ffprobe startup and disk latency rather than
+    CPU, so running the lookups on threads overlaps their waits. The results also
+    land in the metadata cache, which is saved once after all lookups finish, so
+    later get_audio_metadata calls return at once.
+
+    Args:
+        file_paths (list): Paths of the audio files.
+        max_workers (int): Maximum number of concurrent lookups (default 16).
+
+    Returns:
+        dict: The recording date of each file, keyed by path.
+    """
+    if not file_paths:
+        return {}
+    lookup = partial(get_audio_metadata, save_cache=False)
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(file_paths))) as executor:
+            return dict(zip(file_paths, executor.map(lookup, file_paths)))
+    finally:
+        _save_metadata_cache()
+
+# Extensions of input files handled as audio recordings and as transcripts.
+AUDIO_EXTENSIONS = frozenset({".mp3", ".wav", ".m4a", ".flac", ".ogg", ".aac"})
+TRANSCRIPT_EXTENSIONS = (".txt", ".vtt")
+_TRANSCRIPT_SUFFIX_LENGTH = max(map(len, TRANSCRIPT_EXTENSIONS))
+
 def is_audio_file(file_path):
     """
     Checks if the given file is an audio file based on its extension.
@@ -222,8 +506,7 @@ def is_audio_file(file_path):
     Returns:
         bool: True if the file is an audio file, False otherwise.
     """
-    audio_extensions = {".mp3", ".wav", ".m4a", ".flac", ".ogg", ".aac"}
-    return os.path.splitext(file_path)[1].lower() in audio_extensions
+    return os.path.splitext(file_path)[1].lower() in AUDIO_EXTENSIONS
 
 def is_transcript_file(file_path):
     """
@@ -235,21 +518,52 @@ def is_transcript_file(file_path):
     Returns:
         bool: True if the file is a transcript, False otherwise.
     """
-    return file_path.lower().endswith((".txt", ".vtt"))
+    # Only the tail can match, so the rest of the path is not lowercased.
+    return file_path[-_TRANSCRIPT_SUFFIX_LENGTH:].lower().endswith(TRANSCRIPT_EXTENSIONS)
+
+def discover_inputs(input_dir):
+    """
+    Lists the audio and transcript files in a directory with a single scan.
+
+    Args:
+        input_dir (str): Directory to scan.
+
+    Returns:
+        tuple: (audio_files, transcript_files), lists of file names in input_dir.
+    """
+    audio_files = []
+    transcript_files = []
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if is_audio_file(entry.name):
+                audio_files.append(entry.name)
+            elif is_transcript_file(entry.name):
+                transcript_files.append(entry.name)
+    return audio_files, transcript_files
 
 def list_directory_contents(directory):
     """
-    Logs the contents of a directory.
+    Logs the contents of a directory at DEBUG level.
+
+    Nothing is listed unless DEBUG logging is enabled, so the directory walk costs
+    nothing in normal runs.
 
     Args:
         directory (str): The directory to list the contents of.
     """
-    logging.info(f"Contents of {directory}:")
-    for root, dirs, files in os.walk(directory):
-        for name in files:
-            logging.info(f"  - {os.path.join(root, name)}")
-        for name in dirs:
-            logging.info(f"  - {os.path.join(root, name)}/")
+    if not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return
+
+    logging.debug("Contents of %s:", directory)
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                logging.debug("  - %s/", entry.path)
+                list_directory_contents(entry.path)
+            else:
+                logging.debug("  - %s", entry.path)
 
 def estimate_tokens(text, model="gpt-4"):
     """
@@ -277,23 +591,68 @@ def chunk_text(text, max_tokens):
         list: List of text chunks.
     """
     words = text.split()
-    chunks = []
-    current_chunk = []
-    current_token_count = 0
+    # estimate_tokens rounds a single word down to one token, so a chunk holds
+    # exactly max_tokens words and the chunks are plain slices of the word list.
+    words_per_chunk = max(1, int(max_tokens))
+    return [
+        " ".join(words[i:i + words_per_chunk])
+        for i in range(0, len(words), words_per_chunk)
+    ]
 
-    for word in words:
-        word_token_count = estimate_tokens(word)
-        if current_token_count + word_token_count > max_tokens:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = []
-            current_token_count = 0
-        current_chunk.append(word)
-        current_token_count += word_token_count
+class RateLimiter:
+    """
+    Throttles API requests to per-minute request and token budgets.
 
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
+    Callers wait before sending instead of backing off after a rate limit error,
+    so concurrent workers share one budget rather than retrying in lockstep. A
+    limit of 0 disables that limit.
 
-    return chunks
+    Args:
+        requests_per_minute (int): Maximum requests per minute, or 0 for no limit.
+        tokens_per_minute (int): Maximum tokens per minute, or 0 for no limit.
+        window (float): Length of the sliding window in seconds.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, window=60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._sent = deque()  # (timestamp, tokens) of requests inside the window
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=0):
+        """
+        Blocks until a request of the given size fits within both limits.
+
+        Args:
+            tokens (int): Estimated number of tokens the request will use.
+        """
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0][0] >= self.window:
+                    self._tokens_in_window -= self._sent.popleft()[1]
+                over_requests = (
+                    self.requests_per_minute
+                    and len(self._sent) >= self.requests_per_minute
+                )
+                # A request larger than the whole token budget is let through
+                # once the window is empty rather than blocking forever.
+                over_tokens = (
+                    self.tokens_per_minute
+                    and self._sent
+                    and self._tokens_in_window + tokens > self.tokens_per_minute
+                )
+                if not over_requests and not over_tokens:
+                    self._sent.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+                wait = self.window - (now - self._sent[0][0])
+            logging.debug("Rate limit budget reached, waiting %.1fs", wait)
+            time.sleep(wait)
 
 def safe_file_operation(func):
     """
@@ -359,6 +718,7 @@ def validate_environment_variables(required_vars):
     return True
 
 if __name__ == "__main__":
+    configure_logging()
     # Example usage and testing
     test_dir = "./test_utils"
     ensure_dir(test_dir)
@@ -1,19 +1,25 @@
 import os
+import time
 import logging
 import shutil
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from logging.handlers import RotatingFileHandler
-from app.audio_processing import process_files
 from app.utils import (
     list_available_prompts,
     select_prompt,
     is_audio_file,
     is_transcript_file,
+    discover_inputs,
     ensure_dir,
     cleanup_old_logs,
     validate_environment_variables,
     format_time,
+    get_audio_metadata_batch,
     get_file_size,
+    LOG_FORMAT,
 )
 from app.audio_utils import get_audio_length
 from rich.console import Console
@@ -36,7 +42,7 @@ def setup_logging():
         log_file, maxBytes=10 * 1024 * 1024, backupCount=5
     )
     file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    file_formatter = logging.Formatter(LOG_FORMAT)
     file_handler.setFormatter(file_formatter)
 
     root_logger = logging.getLogger()
@@ -119,6 +125,62 @@ def get_user_choice(prompt, options):
             return int(choice)
         print("Invalid choice. Please enter 1 or 2.")
 
+def process_file(
+    settings, input_dir, processed_dir, base_output_dir, progress, summary_executor
+):
+    """
+    Run the processing pipeline for a single file with its chosen settings.
+
+    The file is summarized on summary_executor, so this returns once its
+    transcript has been merged.
+
+    Returns:
+        tuple: The processing time for the file in seconds and the futures of its
+        summaries, each resolving to the time spent summarizing.
+    """
+    from app.audio_processing import process_files
+
+    file_task = progress.add_task(
+        f"Processing: {settings['filename']}", total=100
+    )
+
+    return process_files(
+        input_dir,
+        processed_dir,
+        base_output_dir,
+        os.getenv("HF_AUTH_TOKEN"),
+        os.getenv("OPENAI_API_KEY"),
+        os.getenv("ANTHROPIC_API_KEY"),
+        settings["prompt"],
+        settings["summarization_model"],
+        [settings["filename"]]
+        if is_audio_file(settings["filename"])
+        else [],
+        [settings["filename"]]
+        if is_transcript_file(settings["filename"])
+        else [],
+        os.getenv("OPENAI_MODEL"),
+        os.getenv("ANTHROPIC_MODEL"),
+        int(os.getenv("OPENAI_MODEL_TOKEN_LIMIT")),
+        int(os.getenv("ANTHROPIC_MODEL_TOKEN_LIMIT")),
+        use_openai=settings["use_openai"],
+        recording_date=settings["recording_date"],
+        recording_name=settings["recording_name"],
+        progress=progress,
+        file_task=file_task,
+        max_concurrent_transcriptions=int(
+            os.getenv("TRANSCRIPTION_CONCURRENCY", 5)
+        ),
+        keep_intermediates=keep_intermediates(),
+        summary_executor=summary_executor,
+    )
+
+def keep_intermediates():
+    """
+    Whether temporary files should be kept so interrupted runs can be resumed.
+    """
+    return os.getenv("KEEP_INTERMEDIATES", "").lower() in ("1", "true", "yes")
+
 def cleanup_temp_directories():
     """
     Clean up temporary directories created during processing.
@@ -192,11 +254,7 @@ def main():
         return
 
     # Get list of files to process
-    input_files = [
-        f for f in os.listdir(input_dir) if os.path.isfile(os.path.join(input_dir, f))
-    ]
-    audio_files = [f for f in input_files if is_audio_file(f)]
-    transcript_files = [f for f in input_files if is_transcript_file(f)]
+    audio_files, transcript_files = discover_inputs(input_dir)
 
     if not audio_files and not transcript_files:
         console.print(
@@ -209,6 +267,12 @@ def main():
         f"Found {len(audio_files)} audio files and {len(transcript_files)} transcript files."
     )
 
+    # The processing pipeline imports torch, Whisper and pyannote, which takes
+    # seconds; load it in the background while the user answers the prompts.
+    threading.Thread(
+        target=importlib.import_module, args=("app.audio_processing",), daemon=True
+    ).start()
+
     # Prompt for global settings
     use_global_settings = Confirm.ask("Do you want to have the same settings for all of the input files?")
 
@@ -283,9 +347,19 @@ def main():
         )
     console.print(file_table)
 
+    # Recording dates are read for all audio files up front and in parallel, so
+    # the file workers find them in the metadata cache.
+    get_audio_metadata_batch(
+        [
+            os.path.join(input_dir, settings["filename"])
+            for settings in file_settings
+            if settings["recording_date"] is None
+            and is_audio_file(settings["filename"])
+        ]
+    )
+
     # Process files
     successfully_processed_files = 0
-    total_processing_time = 0
 
     with Progress(
         SpinnerColumn(),
@@ -299,50 +373,62 @@ def main():
             "[bold blue]Overall Progress", total=len(file_settings)
         )
 
-        for settings in file_settings:
-            file_task = progress.add_task(
-                f"Processing: {settings['filename']}", total=100
-            )
-
-            try:
-                file_processing_time = process_files(
+        # Files run concurrently so one file's transcription overlaps with the
+        # next file's diarization. Summaries run on their own worker, so a file
+        # slot is free for the next file while its summary is requested.
+        file_concurrency = max(1, int(os.getenv("FILE_CONCURRENCY", 2)))
+        # The files overlap, so the run is timed as a whole; adding up per-file
+        # times would count the overlapping work more than once.
+        processing_start_time = time.time()
+        with ThreadPoolExecutor(
+            max_workers=file_concurrency
+        ) as executor, ThreadPoolExecutor(max_workers=1) as summary_executor:
+            futures = {
+                executor.submit(
+                    process_file,
+                    settings,
                     input_dir,
                     processed_dir,
                     base_output_dir,
-                    os.getenv("HF_AUTH_TOKEN"),
-                    os.getenv("OPENAI_API_KEY"),
-                    os.getenv("ANTHROPIC_API_KEY"),
-                    settings["prompt"],
-                    settings["summarization_model"],
-                    [settings["filename"]]
-                    if is_audio_file(settings["filename"])
-                    else [],
-                    [settings["filename"]]
-                    if is_transcript_file(settings["filename"])
-                    else [],
-                    os.getenv("OPENAI_MODEL"),
-                    os.getenv("ANTHROPIC_MODEL"),
-                    int(os.getenv("OPENAI_MODEL_TOKEN_LIMIT")),
-                    int(os.getenv("ANTHROPIC_MODEL_TOKEN_LIMIT")),
-                    use_openai=settings["use_openai"],
-                    recording_date=settings["recording_date"],
-                    recording_name=settings["recording_name"],
-                    progress=progress,
-                    file_task=file_task,
-                )
-                successfully_processed_files += 1
-                total_processing_time += file_processing_time
-            except Exception as e:
-                logging.exception(f"An error occurred during file processing: {str(e)}")
-                console.print(
-                    f"Error processing {settings['filename']}: {str(e)}",
-                    style="bold red",
-                )
-
-            progress.update(overall_task, advance=1)
+                    progress,
+                    summary_executor,
+                ): settings
+                for settings in file_settings
+            }
+
+            pending_summaries = []
+            for future in as_completed(futures):
+                settings = futures[future]
+                try:
+                    _, summary_futures = future.result()
+                except Exception as e:
+                    logging.exception(f"An error occurred during file processing: {str(e)}")
+                    console.print(
+                        f"Error processing {settings['filename']}: {str(e)}",
+                        style="bold red",
+                    )
+                    progress.update(overall_task, advance=1)
+                else:
+                    pending_summaries.append((settings, summary_futures))
+
+            for settings, summary_futures in pending_summaries:
+                try:
+                    for summary_future in summary_futures:
+                        summary_future.result()
+                    successfully_processed_files += 1
+                except Exception as e:
+                    logging.exception(f"An error occurred during file processing: {str(e)}")
+                    console.print(
+                        f"Error processing {settings['filename']}: {str(e)}",
+                        style="bold red",
+                    )
+
+                progress.update(overall_task, advance=1)
+        total_processing_time = time.time() - processing_start_time
 
     # Clean up temporary directories
-    cleanup_temp_directories()
+    if not keep_intermediates():
+        cleanup_temp_directories()
 
     console.print(
         Panel("Audio processing application completed.", border_style="bold green")
@@ -0,0 +1,84 @@
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from app.audio_utils import (
+    _read_wav_header,
+    convert_to_wav,
+    get_audio_length,
+    read_wav_samples,
+)
+
+
+def _riff(chunks):
+    body = b"WAVE" + b"".join(
+        struct.pack("<4sI", chunk_id, len(payload)) + payload + b"\0" * (len(payload) & 1)
+        for chunk_id, payload in chunks
+    )
+    return struct.pack("<4sI", b"RIFF", len(body)) + body
+
+
+def _fmt(rate=16000, channels=1, width=2):
+    return struct.pack(
+        "<HHIIHH", 1, channels, rate, rate * channels * width, channels * width, width * 8
+    )
+
+
+def test_read_wav_header_skips_other_chunks(tmp_path):
+    pcm = np.arange(100, dtype=np.int16).tobytes()
+    path = tmp_path / "tagged.wav"
+    path.write_bytes(_riff([(b"fmt ", _fmt()), (b"LIST", b"INFOabc"), (b"data", pcm)]))
+
+    byte_rate, data_offset, data_size = _read_wav_header(str(path))
+
+    assert byte_rate == 32000
+    assert data_size == len(pcm)
+    assert path.read_bytes()[data_offset:data_offset + data_size] == pcm
+
+
+def test_read_wav_header_without_data_chunk(tmp_path):
+    path = tmp_path / "empty.wav"
+    path.write_bytes(_riff([(b"fmt ", _fmt())]))
+
+    with pytest.raises(ValueError):
+        _read_wav_header(str(path))
+
+
+def test_read_wav_samples_after_extra_chunk(tmp_path):
+    samples = (np.arange(1600) - 800).astype(np.int16)
+    path = tmp_path / "tagged.wav"
+    path.write_bytes(
+        _riff([(b"fmt ", _fmt()), (b"LIST", b"INFOabc"), (b"data", samples.tobytes())])
+    )
+
+    read, rate = read_wav_samples(str(path))
+
+    assert rate == 16000
+    np.testing.assert_array_equal(read, samples)
+
+
+def test_get_audio_length_of_wav(tmp_path):
+    path = tmp_path / "two_seconds.wav"
+    path.write_bytes(_riff([(b"fmt ", _fmt()), (b"data", b"\0\0" * 32000)]))
+
+    assert get_audio_length(str(path)) == pytest.approx(2.0)
+
+
+def test_convert_to_wav_reuses_target_format(tmp_path):
+    samples = np.arange(800, dtype=np.int16)
+    source = tmp_path / "source.wav"
+    with wave.open(str(source), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    output = tmp_path / "out" / "converted.wav"
+    output.parent.mkdir()
+
+    converted = convert_to_wav(str(source), str(output))
+
+    np.testing.assert_array_equal(converted, samples)
+    assert output.read_bytes() == source.read_bytes()
+    assert not list(output.parent.glob("*.part"))
@@ -0,0 +1,64 @@
+import os
+
+from app.merge import _list_chunk_files, merge_raw_transcriptions, merge_transcriptions
+
+STEM = "team_chunk_1_sync"
+CHUNKS = [
+    f"{STEM}_speaker_SPEAKER_00_chunk_0_9500_0",
+    f"{STEM}_speaker_SPEAKER_01_chunk_9500_12000_1",
+    f"{STEM}_speaker_SPEAKER_00_chunk_12000_40000_2",
+]
+
+
+def _write_chunks(tmp_path):
+    chunks_dir = tmp_path / "chunks"
+    transcriptions_dir = tmp_path / "transcriptions"
+    chunks_dir.mkdir()
+    transcriptions_dir.mkdir()
+    for i, name in enumerate(CHUNKS):
+        (chunks_dir / f"{name}.wav").write_bytes(b"")
+        (transcriptions_dir / f"{name}_transcription.txt").write_text(
+            f"Line {i}", encoding="utf-8"
+        )
+    return str(chunks_dir), str(transcriptions_dir)
+
+
+def test_chunks_are_listed_by_start_time(tmp_path):
+    chunks_dir, transcriptions_dir = _write_chunks(tmp_path)
+
+    assert [os.path.basename(p) for p in _list_chunk_files(chunks_dir, ".wav")] == [
+        f"{name}.wav" for name in CHUNKS
+    ]
+    assert [
+        os.path.basename(p) for p in _list_chunk_files(transcriptions_dir, ".txt")
+    ] == [f"{name}_transcription.txt" for name in CHUNKS]
+
+
+def test_merge_pairs_chunks_with_transcriptions(tmp_path):
+    chunks_dir, transcriptions_dir = _write_chunks(tmp_path)
+    audio_path = str(tmp_path / f"{STEM}.wav")
+
+    raw = merge_raw_transcriptions(transcriptions_dir, audio_path, str(tmp_path / "raw"))
+    merged = merge_transcriptions(raw, None, audio_path, str(tmp_path / "merged"), chunks_dir)
+
+    assert merged.splitlines() == [
+        "[0.0s - 9.5s] SPEAKER_00: Line 0",
+        "[9.5s - 12.0s] SPEAKER_01: Line 1",
+        "[12.0s - 40.0s] SPEAKER_00: Line 2",
+    ]
+
+
+def test_chunks_with_the_same_start_are_ordered_by_index(tmp_path):
+    names = [
+        f"{STEM}_speaker_SPEAKER_01_chunk_5000_9000_10",
+        f"{STEM}_speaker_SPEAKER_00_chunk_5000_7000_2",
+        f"{STEM}_speaker_SPEAKER_02_chunk_0_5000_11",
+    ]
+    for name in names:
+        (tmp_path / f"{name}.wav").write_bytes(b"")
+
+    assert [os.path.basename(p) for p in _list_chunk_files(str(tmp_path), ".wav")] == [
+        f"{names[2]}.wav",
+        f"{names[1]}.wav",
+        f"{names[0]}.wav",
+    ]
@@ -0,0 +1,133 @@
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from app import split
+from app.audio_utils import read_wav_samples
+from app.split import (
+    coalesce_segments,
+    parse_chunk_filename,
+    split_at_silence,
+    write_wav_chunk,
+)
+
+
+def _write_wav(path, samples, rate=16000):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+
+
+def _read_wav(path):
+    with wave.open(str(path), "rb") as wav:
+        return wav.getframerate(), np.frombuffer(wav.readframes(-1), dtype=np.int16)
+
+
+def test_coalesce_merges_consecutive_turns_of_a_speaker():
+    segments = [(0.0, 5.0, "A"), (5.5, 10.0, "A"), (10.0, 12.0, "B"), (12.5, 20.0, "A")]
+
+    assert coalesce_segments(segments, max_duration=30.0) == [
+        (0.0, 10.0, "A"),
+        (10.0, 12.0, "B"),
+        (12.5, 20.0, "A"),
+    ]
+
+
+def test_coalesce_respects_max_duration():
+    segments = [(0.0, 20.0, "A"), (20.0, 35.0, "A"), (35.0, 40.0, "A")]
+
+    assert coalesce_segments(segments, max_duration=30.0) == [
+        (0.0, 20.0, "A"),
+        (20.0, 40.0, "A"),
+    ]
+
+
+def test_coalesce_keeps_overlapping_end():
+    assert coalesce_segments([(0.0, 10.0, "A"), (2.0, 8.0, "A")]) == [(0.0, 10.0, "A")]
+
+
+def test_coalesce_empty():
+    assert coalesce_segments([]) == []
+
+
+def test_short_segment_is_not_split():
+    samples = np.ones(16000 * 10, dtype=np.int16)
+
+    assert split_at_silence(samples, 16000, 1.0, 9.0, max_duration=30.0) == [(1.0, 9.0)]
+
+
+def test_long_segment_is_cut_at_silence():
+    rate = 1000
+    samples = np.full(rate * 70, 1000, dtype=np.int16)
+    # Quiet stretches at 20 s and 45 s, both in the second half of their window.
+    samples[20 * rate:20 * rate + 100] = 0
+    samples[45 * rate:45 * rate + 100] = 0
+
+    pieces = split_at_silence(samples, rate, 0.0, 70.0, max_duration=30.0)
+
+    assert [round(start) for start, _ in pieces] == [0, 20, 45]
+    assert pieces[-1][1] == 70.0
+    assert all(end - start <= 30.0 for start, end in pieces)
+    assert all(a[1] == b[0] for a, b in zip(pieces, pieces[1:]))
+
+
+def test_segment_beyond_samples_is_cut_at_max_duration():
+    samples = np.ones(1000, dtype=np.int16)
+
+    pieces = split_at_silence(samples, 1000, 0.0, 70.0, max_duration=30.0)
+
+    assert pieces == [(0.0, 30.0), (30.0, 60.0), (60.0, 70.0)]
+
+
+def test_parse_chunk_filename():
+    path = "/tmp/chunks/my_chunk_1_rec_speaker_SPEAKER_01_chunk_1500_31250_7.wav"
+
+    assert parse_chunk_filename(path) == (1.5, 31.25, "SPEAKER_01")
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["chunk_0.wav", "rec_speaker_A.wav", "rec_speaker_A_chunk_1_2.wav", "rec_speaker_A_chunk_x_2_0.wav"],
+)
+def test_parse_chunk_filename_rejects_other_names(path):
+    assert parse_chunk_filename(path) is None
+
+
+@pytest.mark.parametrize("memory_mapped", [True, False])
+def test_write_wav_chunk(tmp_path, memory_mapped):
+    source_path = tmp_path / "source.wav"
+    original = (np.arange(16000) % 3000).astype(np.int16)
+    _write_wav(source_path, original)
+    samples = read_wav_samples(str(source_path))[0] if memory_mapped else original
+    chunk_path = tmp_path / "chunk.wav"
+
+    with open(source_path, "rb") as source:
+        write_wav_chunk(str(chunk_path), samples, 16000, 100, 5000, source)
+
+    rate, written = _read_wav(chunk_path)
+    assert rate == 16000
+    np.testing.assert_array_equal(written, original[100:5000])
+
+
+def test_write_wav_chunk_falls_back_when_sendfile_fails(tmp_path, monkeypatch):
+    source_path = tmp_path / "source.wav"
+    original = (np.arange(16000) % 3000).astype(np.int16)
+    _write_wav(source_path, original)
+    samples = read_wav_samples(str(source_path))[0]
+
+    def sendfile(*args):
+        raise OSError(22, "Invalid argument")
+
+    monkeypatch.setattr(split.sys, "platform", "linux")
+    monkeypatch.setattr(split.os, "sendfile", sendfile, raising=False)
+    chunk_path = tmp_path / "chunk.wav"
+
+    with open(source_path, "rb") as source:
+        write_wav_chunk(str(chunk_path), samples, 16000, 0, 20000, source)
+
+    np.testing.assert_array_equal(_read_wav(chunk_path)[1], original)
+    assert os.path.getsize(chunk_path) == 44 + 2 * len(original)
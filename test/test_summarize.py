@@ -0,0 +1,102 @@
+import pytest
+
+from app import summarize
+from app.summarize import (
+    _summary_cache_path,
+    build_prompt,
+    chunk_by_tokens,
+    encode_text,
+    get_encoding,
+)
+
+MODEL = "gpt-4"
+TRANSCRIPT = "\n".join(
+    f"[{i * 5:.1f}s - {i * 5 + 4.5:.1f}s] SPEAKER_0{i % 3}: Line {i} of the meeting, "
+    "with some discussion about the roadmap."
+    for i in range(400)
+)
+
+
+@pytest.fixture
+def encoding():
+    # tiktoken downloads its encodings on first use; without network access the
+    # tests that tokenize are skipped.
+    try:
+        return get_encoding(MODEL)
+    except Exception as e:
+        pytest.skip(f"tiktoken encoding for {MODEL} is unavailable: {e}")
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_by_tokens("A short transcript.", 1000, MODEL) == ["A short transcript."]
+
+
+def test_text_within_limit_is_one_chunk(encoding):
+    n_tokens = len(encoding.encode_ordinary(TRANSCRIPT))
+
+    assert chunk_by_tokens(TRANSCRIPT, n_tokens, MODEL) == [TRANSCRIPT]
+
+
+def test_chunks_respect_limit_and_round_trip(encoding):
+    chunks = chunk_by_tokens(TRANSCRIPT, 500, MODEL)
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == TRANSCRIPT
+    assert all(len(encoding.encode_ordinary(chunk)) <= 501 for chunk in chunks)
+
+
+def test_chunks_do_not_split_characters(encoding):
+    text = "会議の議事録です。🎙️ Café résumé naïve — 要点をまとめます。" * 40
+
+    chunks = chunk_by_tokens(text, 7, MODEL)
+
+    assert "".join(chunks) == text
+    assert not any("\ufffd" in chunk for chunk in chunks)
+    assert all(len(encoding.encode_ordinary(chunk)) <= 7 for chunk in chunks)
+
+
+def test_parallel_encoding_matches_serial(encoding, monkeypatch):
+    serial = encoding.encode_ordinary(TRANSCRIPT)
+    monkeypatch.setattr(summarize, "PARALLEL_ENCODE_MIN_CHARS", 1)
+    monkeypatch.setattr(summarize.os, "cpu_count", lambda: 4)
+
+    tokens = encode_text(TRANSCRIPT, MODEL)
+
+    assert encoding.decode(tokens) == TRANSCRIPT
+    assert len(tokens) == pytest.approx(len(serial), abs=4)
+
+
+def test_build_prompt_keeps_instructions_first():
+    prompt = build_prompt("Summarize:\n{{TRANSCRIPT}}\nUse bullet points.", "the text")
+
+    assert prompt.startswith("Summarize:\n(the transcript is given at the end")
+    assert prompt.endswith("Transcript:\nthe text")
+
+
+def test_build_prompt_trailing_placeholder():
+    assert build_prompt("Summarize:\n{{TRANSCRIPT}}", "the text", " Note.") == (
+        "Summarize:\nthe text Note."
+    )
+
+
+def test_build_prompt_replaces_every_placeholder():
+    prompt = build_prompt(
+        "Summarize {{TRANSCRIPT}}. List the decisions in {{TRANSCRIPT}}", "the text"
+    )
+
+    assert "{{TRANSCRIPT}}" not in prompt
+    assert prompt.count("(the transcript is given at the end") == 2
+    assert prompt.endswith("Transcript:\nthe text")
+
+
+def test_summary_cache_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.delenv("CACHE_SUMMARIES", raising=False)
+    assert _summary_cache_path("prompt", MODEL) is None
+
+    monkeypatch.setenv("CACHE_SUMMARIES", "true")
+    monkeypatch.setenv("SUMMARY_CACHE_DIR", str(tmp_path))
+    path = _summary_cache_path("prompt", MODEL)
+
+    assert path.startswith(str(tmp_path))
+    assert path != _summary_cache_path("prompt", "gpt-4o")
+    assert path != _summary_cache_path("other prompt", MODEL)
@@ -0,0 +1,196 @@
+import os
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app import transcription
+from app.utils import RateLimiter
+
+
+def _fake_transcriber(calls, failing=()):
+    def transcribe_chunk(chunk_path, output_dir, openai_api_key, use_openai):
+        calls.append(os.path.basename(chunk_path))
+        if os.path.basename(chunk_path) in failing:
+            raise ConnectionError("connection reset")
+        text = f"text of {os.path.basename(chunk_path)}"
+        transcription._save_transcription(chunk_path, output_dir, text)
+        return text
+
+    return transcribe_chunk
+
+
+def _chunks(tmp_path, n):
+    paths = []
+    for i in range(n):
+        path = tmp_path / f"rec_speaker_SPEAKER_00_chunk_{i * 1000}_{i * 1000 + 900}_{i}.wav"
+        path.write_bytes(b"")
+        paths.append(str(path))
+    return paths
+
+
+def test_transcribe_chunks_keeps_order(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(transcription, "transcribe_chunk", _fake_transcriber(calls))
+    chunk_files = _chunks(tmp_path, 4)
+
+    texts = transcription.transcribe_chunks(
+        chunk_files, str(tmp_path / "out"), "key", use_openai=True, max_concurrent=2
+    )
+
+    assert texts == [f"text of {os.path.basename(c)}" for c in chunk_files]
+
+
+def test_failed_chunk_fails_the_file(tmp_path, monkeypatch):
+    chunk_files = _chunks(tmp_path, 3)
+    failing = {os.path.basename(chunk_files[1])}
+    monkeypatch.setattr(
+        transcription, "transcribe_chunk", _fake_transcriber([], failing)
+    )
+
+    with pytest.raises(RuntimeError, match="1 of 3 chunks"):
+        transcription.transcribe_chunks(
+            chunk_files, str(tmp_path / "out"), "key", use_openai=True
+        )
+
+
+def test_rerun_only_transcribes_failed_chunks(tmp_path, monkeypatch):
+    chunk_files = _chunks(tmp_path, 3)
+    output_dir = str(tmp_path / "out")
+    failing = {os.path.basename(chunk_files[1])}
+    monkeypatch.setattr(
+        transcription, "transcribe_chunk", _fake_transcriber([], failing)
+    )
+    with pytest.raises(RuntimeError):
+        transcription.transcribe_chunks(chunk_files, output_dir, "key", use_openai=True)
+
+    calls = []
+    monkeypatch.setattr(transcription, "transcribe_chunk", _fake_transcriber(calls))
+    texts = transcription.transcribe_chunks(
+        chunk_files, output_dir, "key", use_openai=True, reuse_existing=True
+    )
+
+    assert calls == [os.path.basename(chunk_files[1])]
+    assert len(texts) == 3
+
+
+def test_failed_batch_is_retried_chunk_by_chunk(tmp_path, monkeypatch):
+    chunk_files = _chunks(tmp_path, 3)
+    output_dir = str(tmp_path / "out")
+    retried = []
+
+    def decode_batch(model, chunk_paths, options):
+        raise RuntimeError("CUDA out of memory")
+
+    def transcribe_audio(audio_path, output_dir, openai_api_key):
+        retried.append(audio_path)
+        return f"text of {os.path.basename(audio_path)}"
+
+    monkeypatch.setattr(transcription, "_get_whisper_model", lambda name, device: None)
+    monkeypatch.setattr(transcription, "_decode_batch", decode_batch)
+    monkeypatch.setattr(transcription, "transcribe_audio", transcribe_audio)
+
+    texts = transcription.transcribe_many(chunk_files, output_dir, batch_size=2)
+
+    assert sorted(retried) == sorted(chunk_files)
+    assert texts == [f"text of {os.path.basename(c)}" for c in chunk_files]
+
+
+def test_chunk_failing_on_its_own_is_raised(tmp_path, monkeypatch):
+    chunk_files = _chunks(tmp_path, 2)
+
+    def decode_batch(model, chunk_paths, options):
+        raise RuntimeError("CUDA out of memory")
+
+    def transcribe_audio(audio_path, output_dir, openai_api_key):
+        raise ValueError(f"cannot decode {audio_path}")
+
+    monkeypatch.setattr(transcription, "_get_whisper_model", lambda name, device: None)
+    monkeypatch.setattr(transcription, "_decode_batch", decode_batch)
+    monkeypatch.setattr(transcription, "transcribe_audio", transcribe_audio)
+
+    with pytest.raises(ValueError):
+        transcription.transcribe_many(chunk_files, str(tmp_path / "out"))
+
+
+def _rate_limit_error(headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/audio/transcriptions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def test_retry_delay_honours_retry_after():
+    assert transcription._retry_delay(_rate_limit_error({"retry-after": "7"}), 0) == 7.0
+    assert transcription._retry_delay(_rate_limit_error({"retry-after": "0.5"}), 2) == 0.5
+
+
+def test_retry_delay_backs_off_exponentially():
+    assert transcription._retry_delay(_rate_limit_error(), 0) == 1
+    assert transcription._retry_delay(_rate_limit_error(), 2) == 4
+    assert transcription._retry_delay(openai.APIConnectionError(request=None), 1) == 2
+    assert transcription._retry_delay(_rate_limit_error({"retry-after": "soon"}), 1) == 2
+
+
+class _FakeTranscriptions:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def create(self, model, file):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(text="hello")
+
+
+def _fake_openai(monkeypatch, errors):
+    transcriptions = _FakeTranscriptions(errors)
+    client = SimpleNamespace(audio=SimpleNamespace(transcriptions=transcriptions))
+    sleeps = []
+    monkeypatch.setattr(transcription, "_get_openai_client", lambda api_key: client)
+    monkeypatch.setattr(transcription, "_get_transcription_rate_limiter", RateLimiter)
+    monkeypatch.setattr(transcription.time, "sleep", sleeps.append)
+    return transcriptions, sleeps
+
+
+def test_openai_transcription_retries_after_retry_after(tmp_path, monkeypatch):
+    chunk = _chunks(tmp_path, 1)[0]
+    transcriptions, sleeps = _fake_openai(
+        monkeypatch, [_rate_limit_error({"retry-after": "3"}), _rate_limit_error()]
+    )
+
+    text = transcription.transcribe_audio_with_openai(chunk, str(tmp_path / "out"), "key")
+
+    assert text == "hello"
+    assert transcriptions.calls == 3
+    assert sleeps == [3.0, 2]
+    with open(transcription.get_transcription_path(chunk, str(tmp_path / "out"))) as f:
+        assert f.read() == "hello"
+
+
+def test_openai_transcription_gives_up_after_max_attempts(tmp_path, monkeypatch):
+    chunk = _chunks(tmp_path, 1)[0]
+    errors = [_rate_limit_error() for _ in range(transcription.OPENAI_MAX_ATTEMPTS)]
+    transcriptions, sleeps = _fake_openai(monkeypatch, errors)
+
+    with pytest.raises(openai.RateLimitError):
+        transcription.transcribe_audio_with_openai(chunk, str(tmp_path / "out"), "key")
+
+    assert transcriptions.calls == transcription.OPENAI_MAX_ATTEMPTS
+    assert len(sleeps) == transcription.OPENAI_MAX_ATTEMPTS - 1
+
+
+def test_openai_transcription_does_not_retry_other_errors(tmp_path, monkeypatch):
+    chunk = _chunks(tmp_path, 1)[0]
+    request = httpx.Request("POST", "https://api.openai.com/v1/audio/transcriptions")
+    error = openai.AuthenticationError(
+        "Invalid API key", response=httpx.Response(401, request=request), body=None
+    )
+    transcriptions, sleeps = _fake_openai(monkeypatch, [error])
+
+    with pytest.raises(openai.AuthenticationError):
+        transcription.transcribe_audio_with_openai(chunk, str(tmp_path / "out"), "key")
+
+    assert transcriptions.calls == 1
+    assert sleeps == []
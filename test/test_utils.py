@@ -0,0 +1,192 @@
+import io
+import json
+import random
+import string
+import struct
+from datetime import datetime
+
+import pytest
+from slugify import slugify
+
+from app import utils
+from app.utils import (
+    RateLimiter,
+    _DISALLOWED_FILENAME_CHARS,
+    _iter_boxes,
+    _read_mp4_creation_time,
+    sanitize_filename,
+)
+
+
+def _box(box_type, payload=b"", large=False):
+    if large:
+        return struct.pack(">I4sQ", 1, box_type, 16 + len(payload)) + payload
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _mvhd(creation, version=0):
+    if version == 1:
+        return _box(b"mvhd", struct.pack(">B3xQQ", 1, creation, creation))
+    return _box(b"mvhd", struct.pack(">B3xII", 0, creation, creation))
+
+
+# 2024-07-23 10:30:00 UTC in seconds since the MP4 epoch (1904-01-01).
+CREATION = int((datetime(2024, 7, 23, 10, 30) - datetime(1904, 1, 1)).total_seconds())
+
+
+def test_iter_boxes():
+    data = _box(b"ftyp", b"M4A ") + _box(b"free", b"x" * 3, large=True) + _box(b"moov")
+    file = io.BytesIO(data)
+
+    boxes = list(_iter_boxes(file, len(data)))
+
+    assert [box_type for box_type, _, _ in boxes] == [b"ftyp", b"free", b"moov"]
+    assert boxes[0] == (b"ftyp", 8, 12)
+    assert boxes[1] == (b"free", 28, 31)
+    assert boxes[2][2] == len(data)
+
+
+def test_iter_boxes_stops_at_invalid_size():
+    data = _box(b"ftyp", b"M4A ") + struct.pack(">I4s", 4, b"bad!") + b"\0" * 8
+
+    assert [box[0] for box in _iter_boxes(io.BytesIO(data), len(data))] == [b"ftyp"]
+
+
+def test_iter_boxes_size_zero_extends_to_end():
+    data = _box(b"ftyp", b"M4A ") + struct.pack(">I4s", 0, b"mdat") + b"\0" * 20
+
+    assert list(_iter_boxes(io.BytesIO(data), len(data)))[-1] == (b"mdat", 20, len(data))
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_read_mp4_creation_time(tmp_path, version):
+    path = tmp_path / "recording.m4a"
+    path.write_bytes(
+        _box(b"ftyp", b"M4A ")
+        + _box(b"mdat", b"\0" * 32)
+        + _box(b"moov", _box(b"trak") + _mvhd(CREATION, version))
+    )
+
+    assert _read_mp4_creation_time(str(path)) == datetime(2024, 7, 23, 10, 30)
+
+
+def test_read_mp4_creation_time_unset(tmp_path):
+    path = tmp_path / "recording.m4a"
+    path.write_bytes(_box(b"ftyp", b"M4A ") + _box(b"moov", _mvhd(0)))
+
+    assert _read_mp4_creation_time(str(path)) is None
+
+
+def test_read_mp4_creation_time_without_movie_header(tmp_path):
+    path = tmp_path / "recording.m4a"
+    path.write_bytes(_box(b"ftyp", b"M4A ") + _box(b"mdat", b"\0" * 16))
+
+    assert _read_mp4_creation_time(str(path)) is False
+
+
+class _FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    clock = _FakeTime()
+    monkeypatch.setattr(utils, "time", clock)
+    return clock
+
+
+def test_rate_limiter_without_limits_never_waits(fake_time):
+    limiter = RateLimiter()
+    for _ in range(100):
+        limiter.acquire(10_000)
+
+    assert fake_time.sleeps == []
+
+
+def test_rate_limiter_requests_per_minute(fake_time):
+    limiter = RateLimiter(requests_per_minute=2)
+    limiter.acquire()
+    fake_time.now = 10.0
+    limiter.acquire()
+    limiter.acquire()  # Waits until the first request leaves the window
+
+    assert fake_time.sleeps == [50.0]
+    assert fake_time.now == 60.0
+
+
+def test_rate_limiter_tokens_per_minute(fake_time):
+    limiter = RateLimiter(tokens_per_minute=1000)
+    limiter.acquire(600)
+    limiter.acquire(400)
+    fake_time.now = 5.0
+    limiter.acquire(1)
+
+    assert fake_time.sleeps == [55.0]
+
+
+def test_rate_limiter_lets_oversized_request_through_empty_window(fake_time):
+    limiter = RateLimiter(tokens_per_minute=1000)
+    limiter.acquire(5000)
+
+    assert fake_time.sleeps == []
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("meeting_notes", "meeting_notes"),
+        ("Team Sync 2024-07-23", "team-sync-2024-07-23"),
+        ("  --Weird__Name!!  ", "weird__name"),
+        ("...", "unnamed_file"),
+        ("Tom's & Jerry's", slugify("Tom's & Jerry's", lowercase=True, regex_pattern=_DISALLOWED_FILENAME_CHARS)),
+        ("Café Überlingen", "cafe-uberlingen"),
+    ],
+)
+def test_sanitize_filename(name, expected):
+    assert sanitize_filename(name) == expected
+
+
+def test_sanitize_filename_fast_paths_match_slugify():
+    rng = random.Random(0)
+    alphabet = string.printable + "éüß€'&,.--__  "
+    for _ in range(20000):
+        name = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+        expected = slugify(name, lowercase=True, regex_pattern=_DISALLOWED_FILENAME_CHARS)
+        expected = expected.strip(".") or "unnamed_file"
+        assert sanitize_filename(name) == expected, name
+
+
+def test_sanitize_filename_truncates_root():
+    assert sanitize_filename("a" * 300 + ".txt", max_length=20) == "a" * 15 + ".txt"
+
+
+def test_metadata_batch_saves_cache_once(tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache" / "metadata.json"
+    monkeypatch.setattr(utils, "METADATA_CACHE_FILE", str(cache_file))
+    monkeypatch.setattr(utils, "_metadata_cache", None)
+    monkeypatch.setattr(utils, "_probe_creation_time", lambda path: datetime(2024, 7, 23))
+    replaces = []
+    real_replace = utils.os.replace
+    monkeypatch.setattr(
+        utils.os, "replace", lambda src, dst: (replaces.append(dst), real_replace(src, dst))
+    )
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"recording_{i}.mp3"
+        path.write_bytes(b"\0" * i)
+        paths.append(str(path))
+
+    dates = utils.get_audio_metadata_batch(paths)
+
+    assert dates == dict.fromkeys(paths, "2024-07-23")
+    assert replaces == [str(cache_file)]
+    assert len(json.loads(cache_file.read_text(encoding="utf-8"))) == 5